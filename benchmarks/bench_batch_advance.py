@@ -0,0 +1,49 @@
+"""
+Benchmark: Achieved simulated seconds per wall second, for samples per frame and speed modes.
+QTimer runs at default interval (10 ms), window is shown offscreen.
+Run from repository root:  QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_batch_advance
+"""
+import json
+import logging
+import sys
+
+from time import perf_counter
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+
+def run(app, window, mode, seconds):
+    """
+    Run event loop for some seconds, return simulated seconds per wall second, and ticks per second.
+    """
+    window.frame_edit.setCurrentText(mode)
+    ticks = []
+    window.timer.timeout.connect(lambda: ticks.append(1))
+    start_index, start = window.global_index_counter, perf_counter()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec()
+    wall = perf_counter() - start
+    window.timer.timeout.disconnect()
+    window.timer.timeout.connect(window.update_plot)
+    return (window.global_index_counter - start_index) * window.step_size / wall, len(ticks) / wall
+
+
+def main(modes=("1", "10", "100", "1000", "Real-time", "x10"), seconds=2.0):
+    app = QApplication([])
+    import simulator                # After QApplication, as in simulator.py.
+
+    logger = logging.getLogger(__name__)
+    logger.addHandler(logging.NullHandler())
+    window = simulator.MainWindow(logger)
+    window.show()
+
+    results = []
+    for mode in modes:
+        rate, tick_rate = run(app, window, mode, seconds)
+        results.append({"mode": mode, "step_size": window.step_size, "sim_seconds_per_wall_second": round(rate, 4), "ticks_per_sec": round(tick_rate, 1)})
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Benchmark: ShiftedChannels ON state for 1 - 16 channels in one array, vs one channel at a time (Python loop).
+Run from repository root:  python -m benchmarks.bench_channels
+"""
+import json
+import sys
+
+from time import perf_counter
+from channels import ShiftedChannels
+from engine import PWMEngine
+from modulation import Modulation
+
+
+def timed(function, repeat):
+    start = perf_counter()
+    for _ in range(repeat):
+        function()
+    return (perf_counter() - start) / repeat * 1e3
+
+
+def main(channel_counts=(1, 2, 4, 6, 8, 12, 16), block_sizes=(100, 1000, 100000), repeat=50):
+    """
+    Small blocks: one tick of scrolling plot, large block: first window. Fixed duty, and modulated (SPWM).
+    """
+    results = []
+    for modulation in (None, Modulation(50, 0.8)):
+        engine = PWMEngine(modulation=modulation)
+        engine.configure(freq=1000, duty=25, step_size=1e-5)
+        for samples, channels in ((samples, channels) for samples in block_sizes for channels in channel_counts):
+            bank = ShiftedChannels(engine, channels, first=0)
+            base = engine.time_base()
+            results.append({
+                "modulation": modulation is not None, "channels": channels, "samples": samples,
+                "bank_ms": round(timed(lambda: bank.bits(123_456, samples), repeat), 3),
+                "per_channel_ms": round(timed(lambda: [base.shifted_pulse_on(123_456, samples, [shift], channels, modulation) for shift in range(channels)], repeat), 3),
+            })
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
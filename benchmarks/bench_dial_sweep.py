@@ -0,0 +1,59 @@
+"""
+Benchmark: cycles dial swept 1 -> 100 (one detent every detent_ms), rebuilds and GUI thread time blocked by them,
+every detent applied (update_delay = 0, old behaviour) vs coalesced (one rebuild per update_delay).
+Run from repository root:  QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_dial_sweep
+"""
+import json
+import logging
+import sys
+
+from time import perf_counter
+from PyQt6.QtWidgets import QApplication
+
+
+def sweep(app, window, update_delay, detent_ms):
+    """
+    Dial 1 -> 100, events are processed between detents, and until last change is applied.
+    """
+    window.dial_freq.blockSignals(True)
+    window.dial_freq.setValue(1)
+    window.dial_freq.blockSignals(False)
+    window.update_delay = update_delay
+    rebuilds, rebuild_time = window.rebuilds, window.rebuild_time
+    start = perf_counter()
+    for cycles in range(1, 101):
+        window.dial_freq.setValue(cycles)
+        detent_end = perf_counter() + detent_ms / 1000
+        while perf_counter() < detent_end:
+            app.processEvents()
+    while window.pending_updates:
+        app.processEvents()
+    return {
+        "update_delay_ms": update_delay, "detent_ms": detent_ms,
+        "rebuilds": window.rebuilds - rebuilds,
+        "blocked_ms": round((window.rebuild_time - rebuild_time) * 1e3, 3),
+        "sweep_ms": round((perf_counter() - start) * 1e3, 3),
+        "cycles": window.number_of_cycles,
+    }
+
+
+def main(detents_ms=(1, 5), update_delays=(0, 16)):
+    app = QApplication([])
+    import simulator
+
+    logger = logging.getLogger(__name__)
+    logger.addHandler(logging.NullHandler())
+    window = simulator.MainWindow(logger)
+    window.timer.stop()
+    window.resize(1280, 800)
+    window.show()
+    window.freq_edit.setText("1000")
+    window.button.click()
+
+    results = [sweep(app, window, update_delay, detent_ms) for detent_ms in detents_ms for update_delay in update_delays]
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark: memory per million samples of two-level traces: float lists (old y_axis_on / y_axis_off),
+scrolling window with ON and OFF state stored as volts, or x axis and Sine (float64) with ON state as 0 / 1 (uint8, OFF drawn from it),
+channels as float64 volts or uint8 levels.
+Run from repository root:  python -m benchmarks.bench_levels
+"""
+import json
+import sys
+import tracemalloc
+
+from numpy import float64, uint8
+from channels import ShiftedChannels
+from engine import PWMEngine, PULSE_ON, FLOAT_ROWS
+from ring_buffer import RingBuffer
+
+
+def measured(build):
+    """
+    Bytes allocated by build() (kept alive until measured).
+    """
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main(samples=1_000_000, channels=16):
+    engine = PWMEngine(graph_chk_off=True, graph_chk_sine=True)
+    block = engine.next_block(samples)
+    on, voltage = block[PULSE_ON], engine.voltage
+    bits = ShiftedChannels(engine, channels).bits(0, samples)
+
+    def ring(values, dtype=float64):
+        buffer = RingBuffer(samples, traces=len(values), dtype=dtype)
+        buffer.fill(values)
+        return buffer
+
+    layouts = {
+        "float_lists_on_off": lambda: (on.tolist(), (voltage - on).tolist()),
+        "window_4_rows_volts": lambda: ring(block),
+        "window_2_rows_and_uint8_levels": lambda: (ring(block[:FLOAT_ROWS]), ring([on != 0], uint8)),
+        f"channels_{channels}_float64_volts": lambda: ring(bits * voltage),
+        f"channels_{channels}_uint8_levels": lambda: ring(bits, uint8),
+    }
+    scale = 1e6 / samples
+    memory = {name: round(measured(build) * scale / 2 ** 20, 3) for name, build in layouts.items()}
+    json.dump({"mb_per_million_samples": memory}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
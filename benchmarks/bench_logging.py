@@ -0,0 +1,84 @@
+"""
+Benchmark: Logging cost per update_plot tick, at INFO and DEBUG level.
+before: f-string debug calls (formatted even at INFO), FileHandler writes in calling (GUI) thread.
+after:  isEnabledFor() guard, lazy %s arguments, DeferredQueueHandler + QueueListener thread.
+Run from repository root:  python -m benchmarks.bench_logging
+"""
+import json
+import logging
+import os
+import sys
+import tempfile
+
+from logging.handlers import QueueListener
+from queue import SimpleQueue
+from time import perf_counter
+from simulator import DeferredQueueHandler
+
+FORMAT = "[%(levelname)s]: %(asctime)s: %(funcName)s: %(message)s"
+
+
+def before_tick(logger, start, end, x_value, y_value, counter, sine_value):
+    """
+    Old update_plot/update_y_axis logging.
+    """
+    logger.debug(f"Plot updating--plot Start: {start}, Plot End: {end}")
+    logger.debug(f"Plot updating--X Axis value appended: {x_value}")
+    logger.debug(f"Plot updating--Y Axis ON value appended: {y_value}")
+    logger.debug(f"Plot updating--Global Counter: {counter}")
+    logger.debug(f"Plot updating--Y Axis SINE value appended: {sine_value}")
+
+
+def after_tick(logger, start, end, x_value, y_value, counter, sine_value):
+    """
+    New update_plot logging.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Plot updating--plot Start: %s, Plot End: %s", start, end)
+        logger.debug("Plot updating--X: %s, ON: %s, Global Counter: %s", x_value, y_value, counter)
+
+
+def make_logger(name, filename, queued):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    handle = logging.FileHandler(filename)
+    handle.setFormatter(logging.Formatter(FORMAT))
+    if not queued:
+        logger.addHandler(handle)
+        return logger, None
+    log_queue = SimpleQueue()
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    listener = QueueListener(log_queue, handle)
+    listener.start()
+    return logger, listener
+
+
+def measure(tick, logger, ticks):
+    """
+    Micro seconds per tick, in calling thread.
+    """
+    start = perf_counter()
+    for counter in range(ticks):
+        tick(logger, 0.1234 + counter, 0.5234 + counter, 0.5234 + counter, 5.0, counter, 4.99)
+    return (perf_counter() - start) / ticks * 1e6
+
+
+def main(ticks=20000):
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for path, tick, queued in (("before", before_tick, False), ("after", after_tick, True)):
+            for level in (logging.INFO, logging.DEBUG):
+                logger, listener = make_logger(f"bench_{path}_{level}", os.path.join(folder, f"{path}_{level}.log"), queued)
+                logger.setLevel(level)
+                per_tick = measure(tick, logger, ticks)
+                if listener:
+                    listener.stop()
+                for handle in logger.handlers:
+                    handle.close()
+                results.append({"path": path, "level": logging.getLevelName(level), "us_per_tick": round(per_tick, 3)})
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
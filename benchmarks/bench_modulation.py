@@ -0,0 +1,36 @@
+"""
+Benchmark: next_block of modulated PWM (SPWM) vs fixed duty, carrier 1 - 20 kHz, per tick block sizes.
+Modulation 50 Hz = from template (reference period is whole number of carrier periods and samples), 60 Hz = computed per block.
+Run from repository root:  python -m benchmarks.bench_modulation
+"""
+import json
+import sys
+
+from time import perf_counter
+from engine import PWMEngine
+from modulation import Modulation
+
+
+def timed(function, repeat):
+    start = perf_counter()
+    for _ in range(repeat):
+        function()
+    return (perf_counter() - start) / repeat * 1e3
+
+
+def main(carriers=(1000, 10000, 20000), block_sizes=(1000, 100000), repeat=20):
+    results = []
+    for freq, samples in ((freq, samples) for freq in carriers for samples in block_sizes):
+        result = {"carrier_hz": freq, "samples": samples}
+        for name, modulation in (("fixed_ms", None), ("spwm_50hz_ms", Modulation(50, 0.8)), ("spwm_60hz_ms", Modulation(60, 0.8))):
+            engine = PWMEngine(graph_chk_sine=True, modulation=modulation)
+            engine.configure(freq=freq, duty=50)
+            engine.next_block(samples)      # Template cache filled.
+            result[name] = round(timed(lambda: engine.next_block(samples), repeat), 3)
+        results.append(result)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: Scrolling window update, list slicing (old update_plot) vs RingBuffer.
+Run from repository root:  python -m benchmarks.bench_ring_buffer
+"""
+import json
+import sys
+import tracemalloc
+
+from time import perf_counter
+from numpy import arange, sin, pi
+from ring_buffer import RingBuffer
+
+VOLTAGE, FREQ, STEP = 5.0, 10, 1e-4
+
+
+def list_tick(window):
+    """
+    Old MainWindow.update_plot path, four traces rebuilt with [1:] + append().
+    """
+    x_axis, y_axis_on, y_axis_off, sine_y = window
+    x_axis = x_axis[1:]
+    x_axis.append(x_axis[-1] + STEP)
+    y_axis_on = y_axis_on[1:]
+    y_axis_on.append(VOLTAGE)
+    y_axis_off = y_axis_off[1:]
+    y_axis_off.append(0.0)
+    sine_y = sine_y[1:]
+    sine_y.append(VOLTAGE * sin(2 * pi * FREQ * x_axis[-1]))
+    return x_axis, y_axis_on, y_axis_off, sine_y
+
+
+def ring_tick(samples):
+    """
+    New path, one sample per trace written into ring buffer, views handed out (as for setData).
+    """
+    x_value = samples.last(0) + STEP
+    samples.append((x_value, VOLTAGE, 0.0, VOLTAGE * sin(2 * pi * FREQ * x_value)))
+    samples.view(0), samples.view(1), samples.view(2), samples.view(3)
+    return samples
+
+
+def measure(tick, state, ticks):
+    """
+    Returns ticks/sec, and peak bytes allocated by a tick (tracemalloc).
+    """
+    start = perf_counter()
+    for _ in range(ticks):
+        state = tick(state)
+    elapsed = perf_counter() - start
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    for _ in range(100):
+        state = tick(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return ticks / elapsed, (peak - base)
+
+
+def main(sizes=(4_000, 40_000, 400_000), ticks=500):
+    results = []
+    for size in sizes:
+        x_axis = list(arange(size) * STEP)
+        window = (x_axis, [VOLTAGE] * size, [0.0] * size, [0.0] * size)
+        samples = RingBuffer(size, traces=4)
+        samples.fill((x_axis, window[1], window[2], window[3]))
+        for name, tick, state in (("list", list_tick, window), ("ring_buffer", ring_tick, samples)):
+            rate, allocated = measure(tick, state, ticks)
+            results.append({"path": name, "window": size, "ticks_per_sec": round(rate, 1), "peak_bytes_per_tick": allocated})
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: streaming throughput over loopback, TCP and Unix socket, float32 and uint8 levels, one reading client.
+Blocks are published as fast as possible, dropped blocks (client too slow) are counted.
+Run from repository root:  python -m benchmarks.bench_stream
+"""
+import asyncio
+import json
+import socket
+import sys
+import time
+
+from threading import Thread
+from time import perf_counter
+from engine import PWMEngine, PULSE_ON
+from stream import FLOAT32, UINT8, SampleServer, frames
+
+
+def measure(level_format, unix, block_size, blocks):
+    path = f"/tmp/pwm_bench_{block_size}.sock" if unix else None
+    server = SampleServer(port=0, path=path, level_format=level_format, depth=64)
+    levels = PWMEngine().next_block(block_size)[PULSE_ON]
+
+    def publish():
+        while not server.clients:
+            time.sleep(0.001)
+        for index in range(blocks):
+            server.publish(index * block_size, levels, 0.0001, 5.0)
+
+    async def receive():
+        """
+        Frames until last one, or none for 1 Sec (last was dropped). Returns frames, time of last frame.
+        """
+        received, last = 0, perf_counter()
+        stream = frames(**({"path": path} if unix else {"port": server.address[1]}))
+        while True:
+            try:
+                start, _, _, _, _ = await asyncio.wait_for(anext(stream), 1.0)
+            except (asyncio.TimeoutError, StopAsyncIteration):
+                break
+            received, last = received + 1, perf_counter()
+            if start == (blocks - 1) * block_size:
+                break
+        await stream.aclose()
+        return received, last
+
+    thread = Thread(target=publish)
+    start = perf_counter()
+    thread.start()
+    received, last = asyncio.run(receive())
+    seconds = last - start
+    thread.join()
+    server.stop()
+    return {
+        "socket": "unix" if unix else "tcp", "format": "uint8" if level_format == UINT8 else "float32", "block_size": block_size,
+        "frames_per_sec": round(received / seconds), "m_samples_per_sec": round(received * block_size / seconds / 1e6, 2),
+        "dropped": server.dropped,
+    }
+
+
+def main(block_sizes=(100, 4096, 65536), blocks=2000):
+    results = []
+    for unix in (False, True) if hasattr(socket, "AF_UNIX") else (False,):
+        for level_format in (FLOAT32, UINT8):
+            for block_size in block_sizes:
+                results.append(measure(level_format, unix, block_size, blocks))
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Benchmark: sweep configurations per second for 1, 2, 4.. worker processes, up to all cores.
+Run from repository root:  python -m benchmarks.bench_sweep
+"""
+import json
+import os
+import sys
+
+from time import perf_counter
+from sweep import grid, sweep
+
+
+def main(cycles=20):
+    configs = grid(range(10, 1010, 10), [10, 25, 50, 75], [1.0, 1e-6], [0], cycles=cycles)     # 800 configurations.
+    cores = os.cpu_count() or 1
+    results, workers = [], 1
+    while True:
+        start = perf_counter()
+        sweep(configs, workers)
+        seconds = perf_counter() - start
+        results.append({"workers": workers, "configs": len(configs), "seconds": round(seconds, 3), "configs_per_sec": round(len(configs) / seconds, 1)})
+        if workers >= cores:
+            break
+        workers = min(workers * 2, cores)
+    for result in results:
+        result["speedup"] = round(result["configs_per_sec"] / results[0]["configs_per_sec"], 2)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark: update_plot cost per tick (including repaint), for shown/hidden OFF and Sine traces.
+Run from repository root:  QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_update_plot
+"""
+import json
+import logging
+import sys
+
+from time import perf_counter
+from PyQt6.QtWidgets import QApplication
+
+
+def measure(app, window, ticks):
+    """
+    Milli seconds per tick, update_plot() + paint.
+    """
+    start = perf_counter()
+    for _ in range(ticks):
+        window.update_plot()
+        app.processEvents()
+    return (perf_counter() - start) / ticks * 1e3
+
+
+def main(cycles=(4, 36, 100), ticks=200):
+    app = QApplication([])
+    import simulator
+
+    logger = logging.getLogger(__name__)
+    logger.addHandler(logging.NullHandler())
+    window = simulator.MainWindow(logger)
+    window.timer.stop()
+    window.resize(1280, 800)
+    window.show()
+
+    results = []
+    for number_of_cycles in cycles:
+        window.dial_freq.setValue(number_of_cycles)
+        for show_off, show_sine in ((False, False), (True, False), (True, True)):
+            window.chk_button.setChecked(show_off)
+            window.chk_button_sine.setChecked(show_sine)
+            measure(app, window, 10)
+            results.append({
+                "cycles": number_of_cycles, "samples": len(window.samples), "show_off": show_off, "show_sine": show_sine,
+                "ms_per_tick": round(measure(app, window, ticks), 3),
+            })
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
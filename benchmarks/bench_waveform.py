@@ -0,0 +1,55 @@
+"""
+Benchmark: Y axis generation, old Python loop vs exact time base (TimeBase.pulse_on()).
+Run from repository root:  python -m benchmarks.bench_waveform
+"""
+import json
+import sys
+
+from time import perf_counter
+from timebase import TimeBase
+
+VOLTAGE, DUTY = 5.0, 10
+
+
+def loop_y_axis(x_axis, length, time_period, pulse_on_time):
+    """
+    Old MainWindow.y_axis() loop.
+    """
+    y_axis, pulse_start, pulse_end = [], 0.0, pulse_on_time
+    for index, value in enumerate(x_axis):
+        if index % length == 0.0 and value != 0.0:
+            pulse_start, pulse_end = pulse_start + time_period, pulse_end + time_period
+        y_axis.append(VOLTAGE if pulse_start <= value <= pulse_end else 0.0)
+    return y_axis
+
+
+def main(configs=((10, 4), (100, 36), (1000, 100), (100, 1000), (10, 1000))):
+    results = []
+    for freq, cycles in configs:
+        accuracy = 2 + len(f"{freq}")
+        time_period, step_size = round(1 / freq, accuracy), 1 / 10 ** (len(f"{freq}") + 2)
+        pulse_on_time = round(time_period * DUTY / 100, accuracy)
+        base = TimeBase(step_size, time_period, pulse_on_time, freq)
+        samples = base.window_size(cycles)
+        x_axis = base.time(0, samples)
+        length = round(samples / cycles)
+
+        start = perf_counter()
+        base.pulse_on(0, samples, VOLTAGE)
+        vectorized = perf_counter() - start
+
+        start = perf_counter()
+        loop_y_axis(x_axis.tolist(), length, time_period, pulse_on_time)
+        loop = perf_counter() - start
+
+        results.append({
+            "freq": freq, "cycles": cycles, "samples": samples,
+            "loop_ms": round(loop * 1e3, 3), "vectorized_ms": round(vectorized * 1e3, 3),
+            "speedup": round(loop / vectorized, 1),
+        })
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Benchmark suite: sweeps frequency, duty, step size and number of cycles, measures
+window generation (engine), update_plot ticks/sec (with repaint), button_update latency, and peak memory.
+Results are written as JSON, with --compare a previous results file is checked for regressions.
+Run from repository root:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.run -o results.json
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.run --quick --compare results.json
+"""
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tracemalloc
+
+from itertools import product
+from time import perf_counter, strftime
+from numpy import __version__ as numpy_version
+from engine import PWMEngine
+
+SWEEP = {"freq": (10, 100, 1000), "duty": (10, 50), "step_divider": (1, 10), "cycles": (4, 36, 100)}
+QUICK = {"freq": (10, 1000), "duty": (10,), "step_divider": (1,), "cycles": (4, 100)}
+HIGHER_IS_BETTER = {"ticks_per_sec"}
+
+
+def configs(sweep):
+    """
+    Every combination, step size = suggested step for frequency / step_divider.
+    """
+    for freq, duty, step_divider, cycles in product(sweep["freq"], sweep["duty"], sweep["step_divider"], sweep["cycles"]):
+        engine = PWMEngine()
+        engine.configure(freq=freq, step_size=1.0)      # Limited to suggested step.
+        yield {"freq": freq, "duty": duty, "step_size": engine.step_size / step_divider, "cycles": cycles}
+
+
+def bench_engine(config, repeat):
+    """
+    First window (old y_axis()), next block of 1000 samples, peak memory of window.
+    """
+    engine = PWMEngine(graph_chk_off=True, graph_chk_sine=True)
+    engine.configure(freq=config["freq"], duty=config["duty"], step_size=config["step_size"], number_of_cycles=config["cycles"])
+    window_times, block_times = [], []
+    for _ in range(repeat):
+        start = perf_counter()
+        engine.window()
+        window_times.append(perf_counter() - start)
+        for _ in range(20):
+            start = perf_counter()
+            engine.next_block(1000)
+            block_times.append(perf_counter() - start)
+
+    tracemalloc.start()
+    engine.window()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "samples": engine.window_size(),
+        "window_ms": min(window_times) * 1e3,
+        "block_us": min(block_times) * 1e6,
+        "window_peak_mb": peak / 2 ** 20,
+    }
+
+
+def bench_gui(app, window, config, ticks):
+    """
+    Update button (new window), cycles dial (incremental), then update_plot ticks with repaint.
+    """
+    window.freq_edit.setText(f"{config['freq']}")
+    window.duty_edit.setText(f"{config['duty']}")
+    window.step_size_edit.setText(f"{config['step_size']}")
+    window.dial_freq.blockSignals(True)
+    window.dial_freq.setValue(max(config["cycles"] - 1, 1))
+    window.dial_freq.blockSignals(False)
+
+    tracemalloc.start()
+    start = perf_counter()
+    window.button.click()
+    app.processEvents()
+    update_ms = (perf_counter() - start) * 1e3
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    start = perf_counter()
+    window.dial_freq.setValue(config["cycles"])
+    app.processEvents()
+    dial_ms = (perf_counter() - start) * 1e3
+
+    start = perf_counter()
+    for _ in range(ticks):
+        window.update_plot()
+        app.processEvents()
+    return {
+        "update_ms": update_ms,
+        "update_peak_mb": peak / 2 ** 20,
+        "dial_ms": dial_ms,
+        "ticks_per_sec": ticks / (perf_counter() - start),
+    }
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"commit": commit, "time": strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(), "numpy": numpy_version}
+
+
+def compare(old, new, threshold):
+    """
+    Print change of every metric, returns number of regressions worse than threshold (0.2 = 20 %).
+    """
+    key = ("freq", "duty", "step_size", "cycles")
+    old_results = {tuple(result[name] for name in key): result for result in old["results"]}
+    regressions = 0
+    for result in new["results"]:
+        previous = old_results.get(tuple(result[name] for name in key))
+        if previous is None:
+            continue
+        for metric, value in result.items():
+            if metric in key or metric == "samples" or not previous.get(metric):
+                continue
+            change = value / previous[metric] - 1
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = "REGRESSION" if worse > threshold else ""
+            regressions += bool(flag)
+            print(f"{result['freq']:>6} Hz {result['duty']:>3} % {result['step_size']:<8g} {result['cycles']:>4} cycles  "
+                  f"{metric:<16}{previous[metric]:>12.3f} -> {value:<12.3f}{change:+8.1%} {flag}", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PWM simulator benchmark suite.")
+    parser.add_argument("--quick", action="store_true", help="Small sweep")
+    parser.add_argument("--no-gui", action="store_true", help="Engine only, no Qt")
+    parser.add_argument("--ticks", type=int, default=50, help="update_plot ticks per config")
+    parser.add_argument("--repeat", type=int, default=5, help="Window generations per config (best is kept)")
+    parser.add_argument("-o", "--output", help="Write results to JSON file, default stdout")
+    parser.add_argument("--compare", help="Previous results JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Regression threshold for --compare")
+    args = parser.parse_args(argv)
+
+    if not args.no_gui:
+        from PyQt6.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([])
+        import simulator
+
+        logger = logging.getLogger(__name__)
+        logger.addHandler(logging.NullHandler())
+        window = simulator.MainWindow(logger)
+        window.timer.stop()
+        window.frame_stats_file = None
+        window.resize(1280, 800)
+        window.show()
+
+    results = []
+    for config in configs(QUICK if args.quick else SWEEP):
+        metrics = bench_engine(config, args.repeat)
+        if not args.no_gui:
+            metrics.update(bench_gui(app, window, config, args.ticks))
+        results.append(dict(config, **{name: round(value, 4) for name, value in metrics.items()}))
+
+    report = {"metadata": metadata(), "results": results}
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(json.load(file), report, args.threshold)
+        print(f"{regressions} regressions above {args.threshold:.0%}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""
+Phase shifted PWM channels over one shared time axis, e.g. channels of a motor drive.
+All channels are generated together as one 2-D array (channels, samples), no loop per channel.
+"""
+
+
+class ShiftedChannels:
+    """
+    Channels first..channels - 1 of engine signal: copies of its ON state delayed by channel / channels of time period,
+    from the exact time base of current engine values, same edges and pulse widths (with modulation too) as channel 0.
+    """
+    def __init__(self, engine, channels, first=1):
+        self.engine = engine
+        self.channels = channels
+        self.shifts = range(first, channels)
+
+    def bits(self, start_index, count):
+        """
+        ON state (bool) of count samples from sample number start_index, shape: (channels - first, count).
+        """
+        return self.engine.time_base().shifted_pulse_on(start_index, count, self.shifts, self.channels, self.engine.modulation)
+
+    def __len__(self):
+        return len(self.shifts)
@@ -0,0 +1,188 @@
+from numpy import empty
+from timebase import time_base
+from waveform import carrier_edges, level_edges, pwm_edges, off_wave, period_template, from_template
+
+X_AXIS, SINE, PULSE_ON, PULSE_OFF = 0, 1, 2, 3     # Rows (traces) of sample blocks.
+FLOAT_ROWS = PULSE_ON                               # Rows before the levels: block[:FLOAT_ROWS] is a view of x axis and Sine.
+
+
+class PWMEngine:
+    """
+    Headless PWM simulation, no Qt required. Holds the signal values (same rules as GUI inputs),
+    and generates the first plot window and the next blocks of samples for scrolling, batch jobs, export.
+    Every block has 4 rows: X_AXIS, SINE, PULSE_ON, PULSE_OFF (levels last, OFF state is the inverse of ON state).
+    """
+    freq = 10                                       # Hz
+    value_accuracy = 2 + len(f"{freq}") if freq % 2 == 0 else 1 + len(f"{freq}")  # increase accuracy for odd freq.
+    time_period = round(1/freq, value_accuracy)     # Time period
+    voltage = 5.0                                   # Volts
+    duty = 10                                       # 10 %
+    step_size = 1/10 ** (len(f"{freq}") + 2)        # Step by which graph increment values. (timeperiod/freq)
+    pulse_on_time = round(1 / freq * (duty / 100), value_accuracy)
+    number_of_cycles = 4                            # Numbers of cycles in a window.
+    suggested_step, suggested_accuracy = step_size, value_accuracy
+    graph_chk_off = False                           # Generate OFF state, else zeros.
+    graph_chk_sine = False                          # Generate Sine wave, else zeros.
+    global_index_counter = 0                        # Sample number of next sample, time = sample number * step size.
+    modulation = None                               # Modulation: duty of every cycle from reference (SPWM), None = fixed duty.
+
+    def __init__(self, **values):
+        """
+        Values: any of the class variables, e.g. PWMEngine(freq=100, duty=50)
+        """
+        for name, value in values.items():
+            if not hasattr(PWMEngine, name):
+                raise AttributeError(f"PWMEngine has no value {name}")
+            setattr(self, name, value)
+
+    def configure(self, voltage=None, freq=None, duty=None, step_size=None, value_accuracy=None, number_of_cycles=None):
+        """
+        Set new values, None = keep current. Accuracy and step size are limited to suggested values for frequency.
+        All values are checked first, on ValueError the engine is unchanged.
+        """
+        voltage = self.voltage if voltage is None else float(voltage)
+        freq = self.freq if freq is None else int(freq)
+        duty = self.duty if duty is None else int(duty)
+        number_of_cycles = self.number_of_cycles if number_of_cycles is None else int(number_of_cycles)
+        value_accuracy = self.value_accuracy if value_accuracy is None else int(value_accuracy)
+        step_size = self.step_size if step_size is None else float(step_size)
+        if freq < 1 or step_size <= 0:
+            raise ValueError("Frequency and Step Size must be above 0")
+
+        suggested_accuracy = 2 + len(f"{freq}") if freq % 2 == 0 else 1 + len(f"{freq}")  # Increase accuracy for odd freq.
+        value_accuracy = suggested_accuracy if value_accuracy < suggested_accuracy else value_accuracy
+        suggested_step = 1/10 ** (len(f"{freq}") + 2)
+        self.voltage, self.freq, self.duty, self.number_of_cycles = voltage, freq, duty, number_of_cycles
+        self.suggested_accuracy, self.value_accuracy = suggested_accuracy, value_accuracy
+        self.suggested_step = suggested_step
+        self.step_size = suggested_step if step_size > suggested_step else step_size
+        self.time_period = round(1/freq, value_accuracy)
+        self.pulse_on_time = round(1 / freq * (duty / 100), value_accuracy)
+
+    def values(self):
+        """
+        Signal values which decide the samples, to compare before and after configure().
+        """
+        return {
+            "freq": self.freq, "time_period": self.time_period, "step_size": self.step_size, "value_accuracy": self.value_accuracy,
+            "voltage": self.voltage, "pulse_on_time": self.pulse_on_time, "number_of_cycles": self.number_of_cycles,
+            "modulation": self.modulation,
+        }
+
+    def window_size(self):
+        """
+        Number of samples in a window of number_of_cycles.
+        """
+        return self.time_base().window_size(self.number_of_cycles)
+
+    def reset(self):
+        """
+        Start again from t = 0, first cycle.
+        """
+        self.global_index_counter = 0
+
+    def time_base(self):
+        """
+        Exact time base for current values (cached).
+        """
+        return time_base(self.step_size, self.time_period, self.pulse_on_time, self.freq)
+
+    def window(self):
+        """
+        First plot window (number_of_cycles). Continue with next_block().
+        """
+        self.reset()
+        return self.next_block(self.window_size())
+
+    def next_block(self, count):
+        """
+        Next count samples after the newest one, shape: (4, count).
+        Time of every sample is sample number * step size, exact time of sample is in the time base.
+        """
+        start_index = self.global_index_counter
+        x_axis = self.time_base().time(start_index, count)
+        y_axis_on = self.pulse_on(start_index, count)
+        self.global_index_counter += count
+        return self.block(x_axis, y_axis_on, start_index)
+
+    def template(self, trace):
+        """
+        One period of PULSE_ON or SINE (modulation reference, with modulation) from template cache,
+        None when the period is not a whole number of steps.
+        """
+        return period_template(
+            "on" if trace == PULSE_ON else "sine", self.freq, self.time_period, self.pulse_on_time, self.voltage, self.step_size, self.modulation
+        )
+
+    def pulse_on(self, start_index, count):
+        """
+        ON state levels of count samples from sample number start_index. Copied from template, else from time base.
+        """
+        template = self.template(PULSE_ON)
+        if template is not None:
+            return from_template(template, start_index, count)
+        if self.modulation is not None:
+            return self.time_base().modulated_pulse_on(start_index, count, self.voltage, self.modulation)
+        return self.time_base().pulse_on(start_index, count, self.voltage)
+
+    def relevel(self, x_axis):
+        """
+        ON state levels of the newest len(x_axis) samples for current pulse width and voltage (after configure()),
+        x_axis is not generated again. Same levels as a new run with these values.
+        """
+        return self.pulse_on(self.global_index_counter - len(x_axis), len(x_axis))
+
+    def blocks(self, total, block_size=65536):
+        """
+        Generator: total samples from t = 0, in blocks of block_size (last one can be smaller).
+        """
+        self.reset()
+        while total > 0:
+            count = min(block_size, total)
+            total -= count
+            yield self.next_block(count)
+
+    def block(self, x_axis, y_axis_on, start_index):
+        """
+        Stack traces, OFF state, and Sine wave are zeros when not enabled (not computed).
+        """
+        block = empty((4, len(x_axis)))
+        block[X_AXIS], block[PULSE_ON] = x_axis, y_axis_on
+        block[PULSE_OFF] = self.trace(PULSE_OFF, x_axis, y_axis_on, start_index) if self.graph_chk_off else 0.0
+        block[SINE] = self.trace(SINE, x_axis, y_axis_on, start_index) if self.graph_chk_sine else 0.0
+        return block
+
+    def edges(self, start, end, voltage=None):
+        """
+        ON state between start and end (time) as corner points (x, y), OFF state = voltage - y.
+        voltage: level of ON state, None = engine voltage (1.0: 0 / 1 levels).
+        With modulation, edges of the samples: carrier and reference can cross more than once per cycle.
+        """
+        voltage = self.voltage if voltage is None else voltage
+        if self.modulation is None:
+            return pwm_edges(start, end, self.time_period, self.pulse_on_time, voltage)
+        first, last = round(start / self.step_size), round(end / self.step_size)
+        on = self.pulse_on(first, last - first + 1) != 0
+        return level_edges(self.time_base().time(first, last - first + 1), on * voltage)
+
+    def carrier(self, start, end):
+        """
+        Carrier of modulation between start and end (time) as corner points (x, y), 0 -> voltage: pulses are ON
+        while carrier <= reference (SINE trace).
+        """
+        return carrier_edges(start, end, self.time_period, self.voltage, self.modulation.carrier)
+
+    def trace(self, trace, x_axis, y_axis_on, start_index):
+        """
+        OFF state (PULSE_OFF) or Sine wave (SINE) for given samples, computed even when not enabled.
+        With modulation, SINE is the modulation reference (duty * voltage), for comparison with the pulses.
+        start_index: sample number of x_axis[0], Sine from template or time base.
+        """
+        if trace == PULSE_OFF:
+            return off_wave(y_axis_on, self.voltage)
+        template = self.template(SINE)
+        if template is not None:
+            return from_template(template, start_index, len(x_axis))
+        if self.modulation is not None:
+            return self.time_base().reference_wave(start_index, len(x_axis), self.voltage, self.modulation)
+        return self.time_base().sine_wave(start_index, len(x_axis), self.voltage)
@@ -0,0 +1,120 @@
+"""
+Export generated PWM signal to CSV, NumPy .npy or WAV, without GUI.
+Samples are written in fixed size blocks, memory use does not depend on duration.
+
+    python export.py --freq 1000 --duty 25 --voltage 5 --step 1e-6 --duration 10 -o pwm.npy
+"""
+import argparse
+import sys
+import wave
+
+from time import perf_counter
+from numpy import clip, savetxt
+from engine import PWMEngine, X_AXIS, PULSE_ON
+
+
+class CSVWriter:
+    """
+    Two columns: time (full precision, every sample time distinct at any duration), voltage.
+    """
+    def __init__(self, path, engine):
+        self.file = open(path, "w")
+        self.file.write("time,voltage\n")
+        self.fmt = ("%.17g", f"%.{engine.value_accuracy + 2}g")
+
+    def write(self, block):
+        savetxt(self.file, block[[X_AXIS, PULSE_ON]].T, fmt=self.fmt, delimiter=",")
+
+    def close(self):
+        self.file.close()
+
+
+class NPYWriter:
+    """
+    NumPy .npy file, shape (samples, 2) columns: time, voltage. Blocks are appended to the file,
+    header has fixed size, and shape is written again on close(). Open with numpy.load(path, mmap_mode="r").
+    """
+    header_size = 128
+
+    def __init__(self, path, engine):
+        self.file = open(path, "wb")
+        self.rows = 0
+        self.write_header()
+
+    def write_header(self):
+        header = f"{{'descr': '<f8', 'fortran_order': False, 'shape': ({self.rows}, 2), }}"
+        header = header.ljust(self.header_size - 10 - 1) + "\n"     # magic(6) + version(2) + length(2)
+        self.file.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1"))
+
+    def write(self, block):
+        self.file.write(block[[X_AXIS, PULSE_ON]].T.astype("<f8").tobytes())
+        self.rows += block.shape[1]
+
+    def close(self):
+        self.file.seek(0)
+        self.write_header()
+        self.file.close()
+
+
+class WAVWriter:
+    """
+    Mono 16 bit WAV, sample rate = 1 / step size. Full scale = voltage.
+    """
+    def __init__(self, path, engine):
+        self.file = wave.open(path, "wb")
+        self.file.setnchannels(1)
+        self.file.setsampwidth(2)
+        self.file.setframerate(round(1 / engine.step_size))
+        self.scale = 32767 / engine.voltage if engine.voltage else 0.0
+
+    def write(self, block):
+        levels = clip(block[PULSE_ON] * self.scale, -32768, 32767)
+        self.file.writeframesraw(levels.astype("<i2").tobytes())
+
+    def close(self):
+        self.file.close()
+
+
+WRITERS = {"csv": CSVWriter, "npy": NPYWriter, "wav": WAVWriter}
+
+
+def export(engine, path, duration, file_format=None, block_size=1 << 18):
+    """
+    Write duration seconds of signal to path. Format from file extension if not given.
+    Returns (samples, seconds taken).
+    """
+    file_format = file_format or path.rsplit(".", 1)[-1].lower()
+    if file_format not in WRITERS:
+        raise ValueError(f"Unknown format: {file_format}, use one of {', '.join(WRITERS)}")
+    total = round(duration / engine.step_size)
+    writer = WRITERS[file_format](path, engine)
+    start = perf_counter()
+    try:
+        for block in engine.blocks(total, block_size):
+            writer.write(block)
+    finally:
+        writer.close()
+    return total, perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export PWM signal to CSV, .npy or WAV.")
+    parser.add_argument("--freq", type=int, default=PWMEngine.freq, help="Frequency (Hz)")
+    parser.add_argument("--duty", type=int, default=PWMEngine.duty, help="Duty cycle (%%)")
+    parser.add_argument("--voltage", type=float, default=PWMEngine.voltage, help="Voltage (V)")
+    parser.add_argument("--step", type=float, default=None, help="Step size (Sec), default suggested for frequency")
+    parser.add_argument("--accuracy", type=int, default=0, help="Accuracy (decimals), default suggested for frequency")
+    parser.add_argument("--duration", type=float, default=1.0, help="Seconds of signal")
+    parser.add_argument("--format", choices=sorted(WRITERS), default=None, help="Default from output extension")
+    parser.add_argument("--block", type=int, default=1 << 18, help="Samples per block")
+    parser.add_argument("-o", "--output", required=True, help="Output file")
+    args = parser.parse_args(argv)
+
+    engine = PWMEngine()
+    engine.configure(voltage=args.voltage, freq=args.freq, duty=args.duty, step_size=args.step or 1.0, value_accuracy=args.accuracy)
+    samples, seconds = export(engine, args.output, args.duration, args.format, args.block)
+    print(f"{samples} samples written to {args.output} in {seconds:.3f} Sec, {samples / max(seconds, 1e-9) / 1e6:.1f} M samples/Sec", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import json
+
+from time import perf_counter, process_time
+from numpy import zeros, int64, cumsum, searchsorted
+
+METRICS = ("compute", "set_data", "interval", "jitter")
+
+
+class FrameStats:
+    """
+    Per tick timings of the plot, in fixed size histograms (milliseconds, last bin = overflow).
+    compute: generate samples, set_data: PlotWidget.setData() calls,
+    interval: time between ticks, jitter: |interval - QTimer interval|.
+    record() is O(1), no allocation.
+    """
+    def __init__(self, max_ms=100.0, bins=400):
+        self.bin_width = max_ms / bins
+        self.bins = bins
+        self.counts = zeros((len(METRICS), bins), dtype=int64)
+        self.total = [0.0] * len(METRICS)
+        self.largest = [0.0] * len(METRICS)
+        self.last_start = None          # Start of previous tick, None = no interval yet.
+
+    def add(self, metric, seconds):
+        value = seconds * 1e3
+        self.counts[metric, min(int(value / self.bin_width), self.bins - 1)] += 1
+        self.total[metric] += value
+        if value > self.largest[metric]:
+            self.largest[metric] = value
+
+    def record(self, start, computed, done, expected):
+        """
+        Times from perf_counter(): tick start, samples computed, setData() done. expected: QTimer interval (Sec).
+        """
+        self.add(0, computed - start)
+        self.add(1, done - computed)
+        if self.last_start is not None:
+            interval = start - self.last_start
+            self.add(2, interval)
+            self.add(3, abs(interval - expected))
+        self.last_start = start
+
+    def percentile(self, metric, percent):
+        """
+        Upper edge of bin (ms) holding the percentile.
+        """
+        counts = cumsum(self.counts[metric])
+        if not counts[-1]:
+            return 0.0
+        return (searchsorted(counts, counts[-1] * percent / 100) + 1) * self.bin_width
+
+    def summary(self):
+        """
+        count, mean, p50, p95, p99, max of every metric (ms).
+        """
+        result = {}
+        for metric, name in enumerate(METRICS):
+            count = int(self.counts[metric].sum())
+            result[name] = {
+                "count": count,
+                "mean": self.total[metric] / count if count else 0.0,
+                "p50": self.percentile(metric, 50),
+                "p95": self.percentile(metric, 95),
+                "p99": self.percentile(metric, 99),
+                "max": self.largest[metric],
+            }
+        return result
+
+    def report(self):
+        """
+        Text for Monitor.
+        """
+        lines = ["        Frame Stats (ms): mean / p95 / max"]
+        for name, values in self.summary().items():
+            lines.append(f"        {name + ':':<16}{values['mean']:.2f} / {values['p95']:.2f} / {values['max']:.2f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """
+        Write summary, and histograms to JSON file.
+        """
+        with open(path, "w") as file:
+            json.dump({
+                "bin_width_ms": self.bin_width,
+                "summary": self.summary(),
+                "histograms": {name: self.counts[metric].tolist() for metric, name in enumerate(METRICS)},
+            }, file, indent=2)
+
+
+class StartupTimer:
+    """
+    Time to first frame, by phase (simulator.py --startup-timing). Phases are milliseconds from process start:
+    imports (before main) as CPU time of process, then wall clock time from creation of timer.
+    """
+    def __init__(self):
+        self.imports = process_time()
+        self.start = perf_counter()
+        self.phases = []
+
+    def mark(self, phase):
+        self.phases.append((phase, self.imports + perf_counter() - self.start))
+
+    def report(self):
+        """
+        Phase, time from process start, time of phase (ms).
+        """
+        lines, last = [f"Startup (ms):   {'imports':<14}{self.imports * 1e3:8.1f}"], self.imports
+        for phase, seconds in self.phases:
+            lines.append(f"                {phase:<14}{seconds * 1e3:8.1f}  (+{(seconds - last) * 1e3:.1f})")
+            last = seconds
+        return "\n".join(lines)
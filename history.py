@@ -0,0 +1,115 @@
+"""
+Long history of ON state levels, append only on disk (memory-mapped for reading), RAM use does not depend on duration.
+A min/max pyramid (level k: min and max of every fanout ** k samples, one file per level) gives any zoom,
+from hours of signal to single edges, with about the same number of plot points.
+"""
+import json
+import os
+
+from numpy import arange, array, asarray, concatenate, empty, float32, int64, maximum, memmap, minimum, repeat, zeros
+
+
+def segment_path(path, segment):
+    """
+    File of history segment (a run with its own time axis), 0: path, else segment number before extension: history-1.f32.
+    """
+    if not segment:
+        return str(path)
+    root, extension = os.path.splitext(str(path))
+    return f"{root}-{segment}{extension}"
+
+
+def write_segments(path, segments):
+    """
+    Index of segments (path.json): file, start (sample number of first sample) and step size (Sec) of every segment.
+    """
+    with open(f"{path}.json", "w") as file:
+        json.dump(segments, file, indent=2)
+
+
+class HistoryStore:
+    """
+    path: samples (float32), path.1, path.2.. min/max levels ((blocks, 2) float32). Files are truncated on creation.
+    start: sample number of first sample, store indexes are from 0.
+    """
+    def __init__(self, path, start=0, fanout=64):
+        self.path = str(path)
+        self.start = start
+        self.fanout = fanout
+        self.files = [open(self.path, "wb")]
+        self.counts = [0]                   # Samples, then blocks of every level.
+        self.pending = [None]               # Values not in a whole block yet (mins, maxs), per level.
+        self.maps = {}                      # level: memmap, mapped again when level grew.
+
+    def __len__(self):
+        return self.counts[0]
+
+    def append(self, values):
+        """
+        Add samples at end, whole blocks are added to every level.
+        """
+        values = asarray(values, dtype=float32)
+        self.files[0].write(values.tobytes())
+        self.counts[0] += len(values)
+        mins, maxs, level = values, values, 1
+        while len(mins):
+            if level == len(self.files):
+                self.files.append(open(f"{self.path}.{level}", "wb"))
+                self.counts.append(0)
+                self.pending.append((empty(0, float32), empty(0, float32)))
+            mins, maxs = concatenate((self.pending[level][0], mins)), concatenate((self.pending[level][1], maxs))
+            whole = len(mins) - len(mins) % self.fanout
+            self.pending[level] = (mins[whole:].copy(), maxs[whole:].copy())
+            mins, maxs = mins[:whole].reshape(-1, self.fanout).min(axis=1), maxs[:whole].reshape(-1, self.fanout).max(axis=1)
+            if len(mins):
+                pairs = empty((len(mins), 2), float32)
+                pairs[:, 0], pairs[:, 1] = mins, maxs
+                self.files[level].write(pairs.tobytes())
+                self.counts[level] += len(mins)
+            level += 1
+
+    def level(self, level):
+        """
+        Memory map of level, 0: samples, else (blocks, 2) min and max of fanout ** level samples.
+        """
+        count, shape = self.counts[level], (self.counts[level],) if level == 0 else (self.counts[level], 2)
+        mapped = self.maps.get(level)
+        if mapped is None or len(mapped) != count:
+            self.files[level].flush()
+            mapped = memmap(self.files[level].name, dtype=float32, mode="r", shape=shape) if count else zeros(shape, float32)
+            self.maps[level] = mapped
+        return mapped
+
+    def envelope(self, start, stop, points=2000, level=None):
+        """
+        Indexes and values between store indexes start and stop, at most about 2 * points values:
+        samples when they are few, else (index, min), (index, max) of groups of blocks, from the coarsest level that fits.
+        Newest samples, not in a whole block of that level yet, are taken from finer levels.
+        """
+        start, stop = max(start, 0), min(stop, self.counts[0])
+        if stop <= start:
+            return empty(0, int64), empty(0, float32)
+        if level is None:
+            level = 0
+            while level + 1 < len(self.counts) and self.fanout ** (level + 1) <= (stop - start) / points:
+                level += 1
+        size = self.fanout ** level
+        first = start // size
+        last = max(first, min(-(-stop // size), self.counts[level]))
+        if level == 0 and last - first <= 2 * points:
+            return arange(first, last), array(self.level(0)[first:last])
+        blocks = self.level(level)[first:last]
+        mins, maxs = (blocks, blocks) if level == 0 else (blocks[:, 0], blocks[:, 1])
+        groups = arange(0, last - first, -(-(last - first) // points)) if last > first else empty(0, int64)
+        index, values = repeat((first + groups) * size, 2), empty(2 * len(groups), float32)
+        if len(groups):
+            values[0::2], values[1::2] = minimum.reduceat(mins, groups), maximum.reduceat(maxs, groups)
+        if last * size < stop:
+            tail_index, tail_values = self.envelope(max(last * size, start), stop, points, level - 1)
+            index, values = concatenate((index, tail_index)), concatenate((values, tail_values))
+        return index, values
+
+    def close(self):
+        self.maps.clear()
+        for file in self.files:
+            file.close()
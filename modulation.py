@@ -0,0 +1,69 @@
+"""
+Modulated PWM (SPWM): duty from a reference signal, sine or one period of user values,
+compared with a triangle (pulses centered in cycle) or sawtooth carrier (pulses from start of cycle).
+"""
+from numpy import absolute, asarray, float64, int64, pi, sin
+
+TRIANGLE, SAWTOOTH = "triangle", "sawtooth"
+CARRIERS = (TRIANGLE, SAWTOOTH)
+
+
+class Modulation:
+    """
+    Reference of freq (Hz, whole number), reference: one period of values -1..1 (None = sine), duty = (1 + index * reference) / 2.
+    ON while carrier <= duty, compared at every sample (natural sampling): triangle carrier (1 at start and end of cycle, 0 at middle)
+    = pulses centered in cycle, sawtooth carrier (0 at start of cycle, 1 at end) = pulses from start of cycle.
+    Equal by value, used as cache key.
+    """
+    def __init__(self, freq=50, index=0.8, reference=None, carrier=TRIANGLE):
+        if int(freq) < 1 or not 0.0 <= float(index) <= 1.0:
+            raise ValueError("Modulation frequency must be above 0, index 0 - 1")
+        if carrier not in CARRIERS:
+            raise ValueError(f"Modulation carrier must be one of {', '.join(CARRIERS)}")
+        self.freq, self.index, self.carrier = int(freq), float(index), carrier
+        self.reference = None if reference is None else asarray(reference, dtype=float64).copy()
+        if self.reference is not None:
+            if not len(self.reference) or abs(self.reference).max() > 1.0:
+                raise ValueError("Reference values must be -1 to 1")
+            self.reference.flags.writeable = False
+
+    def level(self, position):
+        """
+        Reference value -1..1 at position in its period (0 -> 1).
+        """
+        position = asarray(position, dtype=float64)
+        if self.reference is None:
+            return sin(2 * pi * position)
+        return self.reference[(position * len(self.reference)).astype(int64) % len(self.reference)]
+
+    def duty(self, position):
+        """
+        Duty (0 - 1) at position in reference period.
+        """
+        return (1.0 + self.index * self.level(position)) / 2
+
+    def carrier_level(self, in_cycle):
+        """
+        Carrier (0 - 1) at position in carrier cycle (0 -> 1).
+        """
+        in_cycle = asarray(in_cycle, dtype=float64)
+        return absolute(2 * in_cycle - 1) if self.carrier == TRIANGLE else in_cycle
+
+    def on(self, in_cycle, position):
+        """
+        ON state at position in carrier cycle and position in reference period: carrier <= duty.
+        """
+        return self.carrier_level(in_cycle) <= self.duty(position)
+
+    def key(self):
+        return self.freq, self.index, self.carrier, None if self.reference is None else self.reference.tobytes()
+
+    def __eq__(self, other):
+        return isinstance(other, Modulation) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        reference = "sine" if self.reference is None else f"{len(self.reference)} values"
+        return f"Modulation({self.freq} Hz, index {self.index}, {reference}, {self.carrier} carrier)"
@@ -0,0 +1,84 @@
+"""
+Background producer: sample blocks are generated ahead in a worker thread, GUI thread only copies ready blocks.
+"""
+from copy import copy
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from numpy import concatenate, empty
+
+
+class BlockProducer:
+    """
+    Generates blocks of block_size samples from a copy of engine, into a bounded queue (depth blocks ahead).
+    take() never waits, returns what is ready. After new values, call restart(engine): queued blocks are dropped,
+    and generation continues from engine.global_index_counter with new values.
+    """
+    def __init__(self, engine, block_size=4096, depth=64):
+        self.block_size = block_size
+        self.queue = Queue(maxsize=depth)
+        self.lock = Lock()
+        self.stopped = Event()
+        self.generation = 0                 # Blocks of older generation (before restart) are dropped.
+        self.engine = copy(engine)
+        self.leftover = None                # Rest of a block, taken first on next take().
+        self.thread = Thread(target=self.run, name="BlockProducer", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped.is_set():
+            with self.lock:
+                engine, generation = self.engine, self.generation
+                block = engine.next_block(self.block_size)
+            while not self.stopped.is_set() and generation == self.generation:
+                try:
+                    self.queue.put((generation, block), timeout=0.05)
+                    break
+                except Full:
+                    pass
+
+    def restart(self, engine):
+        """
+        Continue from engine (values, and sample number), ready blocks are dropped.
+        """
+        with self.lock:
+            self.engine = copy(engine)
+            self.generation += 1
+            self.leftover = None
+            while not self.queue.empty():
+                try:
+                    self.queue.get_nowait()
+                except Empty:
+                    break
+
+    def take(self, count):
+        """
+        Up to count ready samples, shape: (4, n), n = 0 when nothing is ready.
+        """
+        blocks, ready = [], 0
+        if self.leftover is not None:
+            blocks.append(self.leftover)
+            ready, self.leftover = self.leftover.shape[1], None
+        while ready < count:
+            try:
+                generation, block = self.queue.get_nowait()
+            except Empty:
+                break
+            if generation == self.generation:
+                blocks.append(block)
+                ready += block.shape[1]
+        if not blocks:
+            return empty((4, 0))
+        block = blocks[0] if len(blocks) == 1 else concatenate(blocks, axis=1)
+        if ready > count:
+            block, self.leftover = block[:, :count], block[:, count:]
+        return block
+
+    def ready(self):
+        """
+        Number of ready samples (approximate, producer is running).
+        """
+        return self.queue.qsize() * self.block_size + (0 if self.leftover is None else self.leftover.shape[1])
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
@@ -0,0 +1,96 @@
+from numpy import empty, zeros, float64, asarray
+
+
+class RingBuffer:
+    """
+    Fixed size circular buffer, holds the traces (x-axis, ON, Sine) of the scrolling window.
+    Every sample is written twice (at index and index + size), so the window is always one
+    contiguous slice of memory, and views can be handed to PlotWidget.setData() without copying.
+    Row index = trace, e.g. buffer.view(0) -> x-axis.
+    """
+    def __init__(self, size, traces=1, dtype=float64):
+        if size < 1:
+            raise ValueError("RingBuffer size must be at least 1")
+        self.size = size
+        self.traces = traces
+        self.head = 0                                       # Index of oldest sample.
+        self.data = zeros((traces, 2 * size), dtype=dtype)  # Double length, mirrored writes.
+
+    def fill(self, values):
+        """
+        Replace whole window, values shape: (traces, size).
+        """
+        values = asarray(values, dtype=self.data.dtype)
+        self.data[:, :self.size] = values
+        self.data[:, self.size:] = values
+        self.head = 0
+
+    def append(self, sample):
+        """
+        Add one value per trace at end of window, oldest value is dropped. O(1).
+        """
+        self.data[:, self.head] = sample
+        self.data[:, self.head + self.size] = sample
+        self.head = (self.head + 1) % self.size
+
+    def extend(self, block):
+        """
+        Add block of values, shape: (traces, n). Oldest n values are dropped.
+        """
+        block = asarray(block, dtype=self.data.dtype)
+        count = block.shape[1]
+        if count >= self.size:
+            self.fill(block[:, count - self.size:])
+            return
+        end = self.head + count
+        if end <= self.size:
+            self.data[:, self.head:end] = block
+            self.data[:, self.head + self.size:end + self.size] = block
+        else:
+            split = self.size - self.head
+            self.data[:, self.head:self.size] = block[:, :split]
+            self.data[:, self.head + self.size:] = block[:, :split]
+            self.data[:, :end - self.size] = block[:, split:]
+            self.data[:, self.size:end] = block[:, split:]
+        self.head = end % self.size
+
+    def resize(self, size, block=None):
+        """
+        New window size, newest samples are kept (oldest dropped), block (traces, n) is added at end.
+        Window is copied once into the new buffer, no temporary arrays.
+        """
+        count = 0 if block is None else block.shape[1]
+        keep = max(min(self.size, size - count), 0)
+        if keep + count < size:
+            raise ValueError("RingBuffer resize: not enough samples for new size")
+        data = empty((self.traces, 2 * size), dtype=self.data.dtype)
+        data[:, :keep] = self.view()[:, self.size - keep:]
+        if keep < size:
+            data[:, keep:size] = block[:, count - (size - keep):]
+        data[:, size:] = data[:, :size]
+        self.data, self.size, self.head = data, size, 0
+
+    def write(self, trace, values):
+        """
+        Overwrite whole window of a single trace (oldest -> newest), keeps mirrored copy in sync.
+        """
+        self.data[trace, self.head:self.head + self.size] = values
+        self.data[trace, :self.head] = self.data[trace, self.size:self.size + self.head]
+        self.data[trace, self.size + self.head:] = self.data[trace, self.head:self.size]
+
+    def view(self, trace=None):
+        """
+        Zero copy view of current window, oldest -> newest. All traces if trace is None.
+        """
+        if trace is None:
+            return self.data[:, self.head:self.head + self.size]
+        return self.data[trace, self.head:self.head + self.size]
+
+    def last(self, trace):
+        """
+        Newest value of a trace.
+        """
+        return self.data[trace, self.head + self.size - 1]
+
+    def __len__(self):
+        return self.size
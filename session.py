@@ -0,0 +1,132 @@
+"""
+Record and replay of simulation sessions. Every parameter change (Update button, cycles dial, modulation) and pause/resume
+is appended to a binary file as one fixed size record, with sample numbers as timestamps.
+Replay regenerates the same samples without GUI, as fast as the engine can:
+
+    python session.py session.pwms -o replay.npy
+    python session.py session.pwms --list
+"""
+import argparse
+import struct
+import sys
+
+from time import perf_counter
+from engine import PWMEngine
+from export import WRITERS
+from modulation import CARRIERS, Modulation
+
+MAGIC = b"PWMSES\x02\x00"          # File type, version 2 (version 1: modulation without carrier, sampled once per cycle).
+VALUES, PAUSE, RESUME, END = range(4)
+KINDS = ("values", "pause", "resume", "end")
+# kind, start, index, voltage, freq, duty, step_size, value_accuracy, number_of_cycles, modulation freq (0 = off), modulation index,
+# carrier (index in CARRIERS).
+RECORD = struct.Struct("<BQQdIIdBIIdB")
+
+
+class SessionRecorder:
+    """
+    Append only: every record is written and flushed at once, a crashed session can be replayed up to the last record.
+    start: sample number of next sample before the change, index: first sample number generated with new values
+    (same as start, or 0 when plot starts again from t = 0). Modulation: sine reference only, other references raise ValueError.
+    Appending to a file of another version raises ValueError.
+    """
+    def __init__(self, path):
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        else:
+            with open(path, "rb") as file:
+                header = file.read(len(MAGIC))
+            if header != MAGIC:
+                self.file.close()
+                raise ValueError(f"{path} is not a session file of version {MAGIC[6]}")
+        self.records = 0
+
+    def record(self, kind, engine, start, index=None):
+        modulation = engine.modulation
+        if modulation is not None and modulation.reference is not None:
+            raise ValueError("Session records sine modulation only, reference values would be replayed as sine")
+        self.file.write(RECORD.pack(
+            kind, start, start if index is None else index, engine.voltage, engine.freq, engine.duty, engine.step_size, engine.value_accuracy,
+            engine.number_of_cycles, 0 if modulation is None else modulation.freq, 0.0 if modulation is None else modulation.index,
+            0 if modulation is None else CARRIERS.index(modulation.carrier),
+        ))
+        self.file.flush()
+        self.records += 1
+
+    def close(self, engine):
+        """
+        END record at newest sample, replay stops there.
+        """
+        self.record(END, engine, engine.global_index_counter)
+        self.file.close()
+
+
+def read_session(path):
+    """
+    Records as (kind, start, index, values, modulation), values: arguments of PWMEngine.configure().
+    Incomplete last record (crash while writing) is skipped. Several sessions appended to one file are read one after another.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a session file of version {MAGIC[6]}")
+    data = data[len(MAGIC):]
+    data = data[:len(data) - len(data) % RECORD.size]
+    for kind, start, index, voltage, freq, duty, step_size, accuracy, cycles, modulation_freq, modulation_index, carrier in RECORD.iter_unpack(data):
+        values = {"voltage": voltage, "freq": freq, "duty": duty, "step_size": step_size, "value_accuracy": accuracy, "number_of_cycles": cycles}
+        modulation = Modulation(modulation_freq, modulation_index, carrier=CARRIERS[carrier]) if modulation_freq else None
+        yield kind, start, index, values, modulation
+
+
+def replay(path, block_size=1 << 18, end=None):
+    """
+    Generator: samples of recorded session in blocks, every sample number once, with values in use when it was generated.
+    end: sample number to stop when session has no END record (crashed), None = stop at last record.
+    """
+    records = [record for record in read_session(path) if record[0] in (VALUES, END)]
+    for (kind, start, index, values, modulation), following in zip(records, records[1:] + [None]):
+        if kind == END:
+            continue
+        stop = following[1] if following is not None else index if end is None else end
+        engine = PWMEngine(modulation=modulation)
+        engine.configure(**values)
+        engine.global_index_counter = index
+        while engine.global_index_counter < stop:
+            yield engine.next_block(min(block_size, stop - engine.global_index_counter))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded PWM simulator session, without GUI.")
+    parser.add_argument("session", help="Session file")
+    parser.add_argument("--list", action="store_true", help="Print records only")
+    parser.add_argument("--end", type=int, default=None, help="Last sample number, for session without END record")
+    parser.add_argument("--block", type=int, default=1 << 18, help="Samples per block")
+    parser.add_argument("--format", choices=sorted(WRITERS), default=None, help="Default from output extension")
+    parser.add_argument("-o", "--output", help="Write samples (time, voltage) to CSV, .npy or WAV")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for kind, start, index, values, modulation in read_session(args.session):
+            print(f"{KINDS[kind]:<7}{start:>14}{index:>14}  {values}  {modulation or ''}")
+        return
+
+    writer, samples, start = None, 0, perf_counter()
+    if args.output:
+        engine = PWMEngine()        # Values of first record, WAV: sample rate and full scale.
+        engine.configure(**next(values for kind, _, _, values, _ in read_session(args.session) if kind == VALUES))
+        writer = WRITERS[args.format or args.output.rsplit(".", 1)[-1].lower()](args.output, engine)
+    try:
+        for block in replay(args.session, args.block, args.end):
+            if writer is not None:
+                writer.write(block)
+            samples += block.shape[1]
+    finally:
+        if writer is not None:
+            writer.close()
+    seconds = perf_counter() - start
+    print(f"{samples} samples replayed in {seconds:.3f} Sec, {samples / max(seconds, 1e-9) / 1e6:.1f} M samples/Sec", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
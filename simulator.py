@@ -1,7 +1,12 @@
+import argparse
 import logging
+import sys
 
-from subprocess import run
-from pyqtgraph import mkPen, PlotWidget
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from time import perf_counter
+from numpy import arange, uint8
+from pyqtgraph import intColor, mkPen, PlotWidget
 from PyQt6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -15,9 +20,61 @@ from PyQt6.QtWidgets import (
     QComboBox,
     QPlainTextEdit
 )
-from PyQt6.QtCore import QTimer, Qt
-from PyQt6.QtGui import QPalette, QColor, QIcon
-from numpy import arange, sin, pi          # , cos, linspace
+from PyQt6.QtCore import QEvent, QTimer, Qt
+from PyQt6.QtGui import QPalette, QColor, QIcon, QTransform
+from ring_buffer import RingBuffer
+from engine import PWMEngine, X_AXIS, PULSE_ON, SINE, FLOAT_ROWS
+from frame_stats import FrameStats, StartupTimer
+from waveform import level_edges, period_template
+# Optional features (channels, modulation, background producer, record, spectrum) are imported when first used, faster startup.
+
+
+VALUES_LOG = """Initialized with values....
+            Frequency: %(freq)s
+            Time Period: %(time_period)s
+            Voltage: %(voltage)s
+            Duty Cycle: %(duty)s
+            Step Size: %(step_size)s
+            Intervel: %(intervel)s
+            Pulse width: %(pulse_on_time)s
+            No. Cycles: %(number_of_cycles)s
+            Start x-axis: %(start_x_axis)s
+            End x-axis: %(end_x_axis)s
+            Round Value point: %(value_accuracy)s
+            """
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Put log record on queue as it is, message is formatted by QueueListener thread (not in GUI thread).
+    Only immutable values (numbers, strings) must be passed as log arguments.
+    """
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(filename="simulator.log", level=logging.INFO):
+    """
+    Logger writing to file from background thread. Returns (logger, listener), call listener.stop() on exit.
+    """
+    handle = logging.FileHandler(filename=filename)
+    format = logging.Formatter("[%(levelname)s]: %(asctime)s: %(funcName)s: %(message)s")
+    handle.setFormatter(format)
+
+    log_queue = SimpleQueue()
+    listener = QueueListener(log_queue, handle)
+    logger = logging.getLogger(__name__)
+    logger.setLevel(level)
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    listener.start()
+    return logger, listener
+
+
+def engine_value(name):
+    """
+    MainWindow attribute, stored in self.engine (headless simulation).
+    """
+    return property(lambda self: getattr(self.engine, name), lambda self, value: setattr(self.engine, name, value))
 
 
 class MainWindow(QMainWindow):
@@ -29,48 +86,70 @@ class MainWindow(QMainWindow):
     GitHub: https://github.com/4yub1k
     YouTube: https://www.youtube.com/@nerdyayubi
     """
-    freq = 10                                       # Hz
-    value_accuracy = 2 + len(f"{freq}") if freq % 2 == 0 else 1 + len(f"{freq}")  # increase accuracy for odd freq.
-    time_period = round(1/freq, value_accuracy)     # Time period
-    voltage = 5.0                                   # Volts
-    duty = 10                                       # 10 %
-    step_size = 1/10 ** (len(f"{freq}") + 2)        # Step by which graph increment values. (timeperiod/freq)
+    # Signal values, and pulse bookkeeping live in PWMEngine (engine.py), MainWindow is a view over it.
+    freq = engine_value("freq")                     # Hz
+    value_accuracy = engine_value("value_accuracy")
+    time_period = engine_value("time_period")       # Time period
+    voltage = engine_value("voltage")               # Volts
+    duty = engine_value("duty")                     # %
+    step_size = engine_value("step_size")           # Step by which graph increment values. (timeperiod/freq)
+    pulse_on_time = engine_value("pulse_on_time")
+    graph_chk_off = False                           # Off/ON graph of duty, drawn from ON state (not generated by engine).
+    graph_chk_sine = engine_value("graph_chk_sine")  # show sine wave.
+    suggested_step = engine_value("suggested_step")
+    suggested_accuracy = engine_value("suggested_accuracy")
+    number_of_cycles = engine_value("number_of_cycles")  # Numbers of cycles to show at a time on plot. Also for Knob
+    global_index_counter = engine_value("global_index_counter")
+
     intervel = 10                                   # mSecs, QTimer
-    pulse_on_time = round(1 / freq * (duty / 100), value_accuracy)
-    graph_chk_off = False                           # Off/ON graph of duty
-    graph_chk_sine = False                          # show sine wave.
-    suggested_step, suggested_accuracy = step_size, value_accuracy
+    samples_per_frame = 1                           # Samples added to plot on every QTimer tick.
+    speed = 0.0                                     # Simulated seconds per wall second, 0.0 = use samples_per_frame.
+    sample_debt = 0.0                               # Fraction of sample left from last tick (speed mode).
+    sim_rate = 0.0                                  # Measured simulated seconds per wall second.
+    edge_plot = True                                # Draw ON/OFF state from pulse edges, else from samples.
+    downsample = 0                                  # Graphs from samples: 0 = Auto (from plot width), 1 = Off, N = keep 1 of N.
+    channels = 1                                    # PWM channels, extra channels are phase shifted 360/channels, stacked above.
+    bank, channel_samples, channel_graphs = None, None, ()
+    producer = None                                 # BlockProducer when "Background" is checked, else samples are generated in update_plot().
+    session = None                                  # SessionRecorder when "Record" is checked.
+    session_file = "session.pwms"                   # Recorded sessions are appended here.
+    frame_stats = None                              # FrameStats when "Frame Stats" is checked, else None.
+    frame_stats_file = "frame_stats.json"           # Frame stats are written here on exit, None = don't write.
+    stats_shown = 0.0                               # Last time frame stats were shown in Monitor.
+    show_spectrum = False                           # Spectrum pane (FFT of window, harmonics, THD) is shown.
+    spectrum_plot = None                            # PlotWidget of spectrum, created when shown first time.
+    spectrum_rate = 4.0                             # Spectrum refreshes per second, FFT is not computed on every tick.
+    spectrum_shown = 0.0                            # Last time spectrum was refreshed.
+    history = None                                  # HistoryStore when "History" is checked, whole run on disk.
+    history_file = "history.f32"                    # Samples of history, min/max levels in history.f32.1, .2..
+    history_segments = ()                           # Segment (run from t = 0) files, start, step size; next runs: history-1.f32..
+    history_curve = None                            # Graph of history, shown when paused.
+    stream = None                                   # SampleServer when "Stream" is checked.
+    stream_port = 5555                              # Local TCP port of sample server.
+    line_graph_off = sine_wave = carrier_curve = None   # OFF state, Sine (reference) and carrier graphs, created when shown first time.
+    filled = False                                  # First window of samples generated (deferred: after first frame).
+    fill_pending = False                            # Deferred first_fill() is scheduled.
+    update_delay = 16                               # mSecs, parameter changes within this time are applied together (one rebuild).
+    last_update = 0.0                               # Time of last applied parameter change.
+    rebuilds, rebuild_time = 0, 0.0                 # Applied parameter changes, and seconds taken (GUI thread blocked).
 
     """For X- Axis Configuration"""
-    number_of_cycles = 4                          # Numbers of cycles to show at a time on plot. Also for Knob
     start_x_axis = 0.0
-    end_x_axis = round((1/freq) * number_of_cycles, value_accuracy)  # End of x-axis, t=1/f = 1/1000 = 0.001 * 10 = 0.01, remove 1 zero to adjust the scale.
-    pulse_end, pulse_start = pulse_on_time, 0.0
-    global_index_counter = 0.0
+    end_x_axis = round((1/PWMEngine.freq) * PWMEngine.number_of_cycles, PWMEngine.value_accuracy)  # End of x-axis, t=1/f = 1/1000 = 0.001 * 10 = 0.01, remove 1 zero to adjust the scale.
 
-    def __init__(self, logger):
+    def __init__(self, logger, deferred=False, startup=None):
         """
         Main window of APP, Gridlayout is used.
         Where initial plots are plotted. Button, and Check boxex are added. QTimer Is defined
+        deferred: window is shown first, samples are generated and drawn after first frame (faster startup).
+        startup: StartupTimer, phases of startup are marked, and reported after first frame with data.
         """
         super().__init__()
 
+        self.engine = PWMEngine()
         self.logger = logger
-        self.logger.info(
-            f"""Initialized with values....
-            Frequency: {self.freq}
-            Time Period: {self.time_period}
-            Voltage: {self.voltage}
-            Duty Cycle: {self.duty}
-            Step Size: {self.step_size}
-            Intervel: {self.intervel}
-            Pulse width: {self.pulse_on_time}
-            No. Cycles: {self.number_of_cycles}
-            Start x-axis: {self.start_x_axis}
-            End x-axis: {self.end_x_axis}
-            Round Value point: {self.value_accuracy}
-            """
-        )
+        self.startup = startup
+        self.log_values()
         self.setWindowTitle("PWM Simulator/Generator")
         self.grid_layout = QGridLayout()
 
@@ -88,35 +167,23 @@ class MainWindow(QMainWindow):
         self.plt.addLegend(brush=(0, 0, 255, 50), labelTextColor="w", offset=1, colCount=3)
         self.legend = self.plt.plotItem.legend
 
-        # Generate X - Axis.
+        # Window of X axis and Sine wave, ON state as 0 / 1 levels (OFF state is not stored), generated in first_fill().
         # f = 10 Hz, T = 1/10 = 0.1, range 0 -> 0.1, and wih steps, 0.1/10 = 0.01 (step_size = timeperiod/freq)
-        self.x_axis = list(round(n, self.value_accuracy) for n in arange(0.0, self.time_period * self.number_of_cycles, self.step_size))
+        self.samples = RingBuffer(self.engine.window_size(), traces=FLOAT_ROWS)
+        self.levels = RingBuffer(self.engine.window_size(), dtype=uint8)
         self.plt.setXRange(0.0, self.end_x_axis)
-        self.logger.debug(
-            f"""
-            x-Axis generated; Size: {len(self.x_axis)},
-            Plot Start: {0.0} Plot End: {self.time_period * self.number_of_cycles}
-            """
-        )
 
         # PWM ON state Graph.
-        self.y_axis_on = self.y_axis()
         pen = mkPen(color=(0, 255, 0))
-        self.line_graph = self.plt.plot(self.x_axis, self.y_axis_on, pen=pen, fillLevel=0.0, brush=(0, 255, 0, 100))
-        self.logger.debug(f"Y- Axis size for ON state: {len(self.y_axis_on)}")
+        self.line_graph = self.plt.plot(pen=pen, fillLevel=0.0, brush=(0, 255, 0, 100))
+        self.line_graph.setClipToView(True)     # Only points inside visible range are drawn (zoomed in).
+        self.update_level_transforms()
 
         # Update Legend values dynamically.
         self.update_legend()
 
-        # PWM OFF state Graph.
-        self.y_axis_off = [0] * len(self.x_axis)
-        self.line_graph_off = self.plt.plot(self.x_axis, self.y_axis_off, fillLevel=0.0, brush=(255, 0, 0, 100))  # (r,g,b,a), a = fill level
-        self.logger.debug(f"Y- Axis size for OFF state: {len(self.y_axis_on)}")
-
-        # Plot Sine Wave. (Frequeny is already included in X Axis)
-        self.sine_y = [0] * len(self.x_axis)
-        self.sine_wave = self.plt.plot(self.x_axis, self.sine_y, pen=mkPen(color=(255, 0, 0)))
-        self.logger.debug(f"Y- Axis size for SINE: {len(self.y_axis_on)}")
+        # PWM OFF state, and Sine wave graphs are created when shown first time, see trace_update().
+        self.update_downsampling()
 
         self.grid_layout.addWidget(self.plt, 0, 0, 1, 0)  # last 0, 1 will expand, rowSpan, columSpan
 
@@ -144,96 +211,373 @@ class MainWindow(QMainWindow):
         widget.setLayout(self.grid_layout)
         self.setCentralWidget(widget)
 
-        # Timer
+        # Timer, started with first window of samples.
         self.timer = QTimer()                   # time = QTimer(self), or call with instance.
         self.timer.setInterval(self.intervel)
         self.timer.timeout.connect(self.update_plot)
+        self.rate_samples = 0
+
+        # Timer for coalesced parameter changes, see schedule_update().
+        self.update_timer = QTimer()
+        self.update_timer.setSingleShot(True)
+        self.update_timer.timeout.connect(self.apply_updates)
+        self.pending_updates = set()
+        self.mark_startup("window")
+        if deferred or startup is not None:
+            self.plt.viewport().installEventFilter(self)     # First frame, see eventFilter().
+        if not deferred:
+            self.first_fill()
+
+    def first_fill(self):
+        """
+        Generate first window of samples, draw, and start QTimer.
+        """
+        self.fill_samples()
+        self.logger.debug("x-Axis generated; Size: %s, Plot Start: 0.0 Plot End: %s", len(self.samples), self.time_period * self.number_of_cycles)
+        self.build_channels()
+        self.update_downsampling()
+        self.draw()
+        self.filled = True
+        self.mark_startup("first data")
+        self.last_tick = self.rate_start = perf_counter()
         self.timer.start()
 
+    def eventFilter(self, watched, event):
+        """
+        First paint of plot: deferred window is filled, and (startup timing) first frame with data is reported.
+        """
+        if event.type() == QEvent.Type.Paint and watched is self.plt.viewport():
+            if not self.filled and not self.fill_pending:
+                self.fill_pending = True
+                self.mark_startup("first frame")
+                QTimer.singleShot(0, self.first_fill)       # After this frame is painted.
+            elif self.filled:
+                if self.startup is not None:
+                    self.mark_startup("data frame")
+                    self.logger.info(self.startup.report())
+                    print(self.startup.report(), file=sys.stderr)
+                    self.startup = None
+                watched.removeEventFilter(self)
+        return super().eventFilter(watched, event)
+
+    def mark_startup(self, phase):
+        if self.startup is not None:
+            self.startup.mark(phase)
+
     def update_plot(self):
         """
-        Update axis by removing firt value of list, and then appending single value to their list (at end).
-        Controlled by QTimer().
+        Update axis by appending block of values to ring buffer (at end), oldest values are dropped.
+        Controlled by QTimer(), one redraw per tick.
         """
-        # Update X axis Range.
-        self.start_x_axis += self.step_size
-        self.end_x_axis += self.step_size
+        now = perf_counter()
+        count = self.frame_samples(now)
+        block = self.next_block(count) if count else None
+        self.measure_rate(now, 0 if block is None else block.shape[1])
+        if block is None or not block.shape[1]:
+            return
+
+        # Next samples of every trace, written into ring buffer (oldest samples are dropped).
+        self.samples.extend(block[:FLOAT_ROWS])
+        self.levels.extend(self.on_levels(block[PULSE_ON]))
+        if self.history is not None:
+            self.history.append(block[PULSE_ON])
+        if self.stream is not None:
+            self.stream.publish(self.global_index_counter - block.shape[1], block[PULSE_ON], self.step_size, self.voltage)
+        if self.bank is not None:
+            self.channel_samples.extend(self.bank.bits(self.global_index_counter - block.shape[1], block.shape[1]))
+
+        # Update X axis Range, from oldest sample (exact time, not accumulated).
+        self.start_x_axis = float(self.samples.view(X_AXIS)[0])
+        self.end_x_axis = self.start_x_axis + self.time_period * self.number_of_cycles
         self.plt.setXRange(self.start_x_axis, self.end_x_axis)
-        self.logger.debug(f"Plot updating--plot Start: {self.start_x_axis}, Plot End: {self.end_x_axis}")
-
-        # Update X axis values.
-        self.x_axis = self.x_axis[1:]
-        self.x_axis.append(self.x_axis[-1] + self.step_size)
-        self.logger.debug(f"Plot updating--X Axis value appended: {self.x_axis[-1] + self.step_size}")
-
-        # PWM ON state update graph------------------------.
-        self.y_axis_on = self.y_axis_on[1:]
-        self.y_axis_on.append(self.update_y_axis(self.global_index_counter, self.x_axis[-1]))
-        self.line_graph.setData(self.x_axis, self.y_axis_on)
-        self.global_index_counter += 1      # Keep updaeing global index counter.
-        self.logger.debug(f"Plot updating--Y Axis ON value appended: {self.y_axis_on[-1]}")
-        self.logger.debug(f"Plot updating--Global Counter: {self.global_index_counter}")
-
-        # PWM OFF state Update graph-------------------------.
-        self.y_axis_off = self.y_axis_off[1:]
-        self.y_axis_off.append(0.0 if self.y_axis_on[-1] == self.voltage else self.voltage)
-
-        # # Check if Show PWM OFF cycle button is checked or not.
-        if self.graph_chk_off:
-            self.line_graph_off.setData(self.x_axis, self.y_axis_off)
-        else:
-            self.y_axis_off = [0] * len(self.x_axis)
-            self.line_graph_off.setData(self.x_axis, self.y_axis_off)
+        if self.logger.isEnabledFor(logging.DEBUG):     # Nothing to do per tick, when DEBUG is off.
+            self.logger.debug("Plot updating--plot Start: %s, Plot End: %s", self.start_x_axis, self.end_x_axis)
+            self.logger.debug(
+                "Plot updating--X: %s, ON: %s, Global Counter: %s",
+                float(self.samples.last(X_AXIS)), self.levels.last(0) * self.voltage, self.global_index_counter
+            )
+
+        stats = self.frame_stats
+        if stats is not None:
+            computed = perf_counter()
+
+        self.draw()
+        if stats is not None:
+            drawn = perf_counter()      # Before spectrum, its FFT is not set_data time.
+        if self.show_spectrum and now - self.spectrum_shown >= 1 / self.spectrum_rate:
+            self.refresh_spectrum(now)
+
+        if stats is not None:
+            self.record_frame(stats, now, computed, drawn)
+
+    def next_block(self, count):
+        """
+        Next samples, from background producer (ready samples, up to count), else generated here.
+        """
+        if self.producer is None:
+            return self.engine.next_block(count)
+        block = self.producer.take(count)
+        self.engine.global_index_counter += block.shape[1]      # Sample number of next shown sample.
+        return block
 
-        # Sine Wave update graph---------------------------.
-        self.sine_y = self.sine_y[1:]
-        self.sine_y.append(self.voltage * sin(2 * pi * self.freq * self.x_axis[-1]))
-        self.logger.debug(f"Plot updating--Y Axis SINE value appended: {self.sine_y[-1]}")
+    def restart_producer(self):
+        """
+        Background producer continues after newest shown sample, with current values.
+        """
+        if self.producer is not None:
+            self.producer.restart(self.engine)
 
-        # Check if show sine wave button is checked or not.
-        if self.graph_chk_sine:
-            self.sine_wave.setData(self.x_axis, self.sine_y)
+    def draw(self):
+        """
+        Set data of shown graphs, ON/OFF state as step curve from pulse edges (4 points per cycle, modulation: level changes),
+        or from samples. Sine wave from samples, carrier of modulation from corner points. Ring buffer views, no copies.
+        ON state and channels are 0 / 1 levels, scaled by graph transforms, OFF state graph is drawn from the same levels (mirrored).
+        """
+        x_axis = self.samples.view(X_AXIS)
+        if self.edge_plot:
+            if self.engine.modulation is None:
+                x_edges, y_edges = self.engine.edges(x_axis[0], x_axis[-1], 1.0)
+            else:                               # Same as engine.edges(), from shown levels.
+                x_edges, y_edges = level_edges(x_axis, self.levels.view(0))
+            self.line_graph.setData(x_edges, y_edges)
+            if self.graph_chk_off:
+                self.line_graph_off.setData(x_edges, y_edges)
         else:
-            # Populate y axis with zeros, to turn off graph. shortcut :)
-            self.sine_y = [0] * len(self.x_axis)
-            self.sine_wave.setData(self.x_axis, self.sine_y)
-            # asyncio.run(self.update_axis(self.x_axis, self.sine_y))
+            self.line_graph.setData(x_axis, self.levels.view(0))
+            if self.graph_chk_off:
+                self.line_graph_off.setData(x_axis, self.levels.view(0))
+        if self.graph_chk_sine:
+            self.sine_wave.setData(x_axis, self.samples.view(SINE))
+        if self.carrier_curve is not None and self.carrier_curve.isVisible():
+            self.carrier_curve.setData(*self.engine.carrier(x_axis[0], x_axis[-1]))
+        for channel, curve in enumerate(self.channel_graphs):
+            curve.setData(x_axis, self.channel_samples.view(channel))
 
-    def y_axis(self):
+    def level_transform(self, scale, offset):
         """
-        Generate Y axis, use return or use self.y_axis. //Temporary Solution.// Problem with rounding
+        Graph transform, shown y = scale * y + offset: voltage applied when drawn, data is not copied.
         """
-        y_axis_new = []
-        self.pulse_start = 0.0
-        self.pulse_end = round(self.pulse_on_time, self.value_accuracy)
-        self.length = round(len(self.x_axis) / self.number_of_cycles)   # axis length/frequency
-        for index, value in enumerate(self.x_axis, start=0):
-            """
-            Don't do operation in if statements, it will mess up accuracy/code,
-            I believe it is due to number of digits after decimal point.
-            """
-            if index % self.length == 0.0 and value != 0.0:
-                self.pulse_start = self.pulse_start + self.time_period
-                self.pulse_end = self.pulse_end + self.time_period
-            if self.pulse_start <= value and value <= self.pulse_end:
-                y_axis_new.append(self.voltage)
-            else:
-                y_axis_new.append(0.0)
-        self.global_index_counter = len(self.x_axis)
-        return y_axis_new
+        return QTransform(1.0, 0.0, 0.0, scale, 0.0, offset)
 
-    def update_y_axis(self, index, value):
+    def update_level_transforms(self):
         """
-        Add single value to Y Axis.
+        ON state = voltage * level, OFF state = voltage - voltage * level (filled down to 0 V, level 1).
         """
-        if index % self.length == 0.0 and value != 0.0:
-            self.pulse_start = self.pulse_start + self.time_period
-            self.pulse_end = self.pulse_end + self.time_period
-            self.logger.debug(f"Update--Start: {self.pulse_start}, Value: {value}, Pulse Width: {self.pulse_on_time}, Time period: {self.time_period}, End: {self.pulse_end}")
-        if value >= self.pulse_start and value <= self.pulse_end:
-            return self.voltage
+        self.line_graph.setTransform(self.level_transform(self.voltage, 0.0))
+        if self.line_graph_off is not None:
+            self.line_graph_off.setTransform(self.level_transform(-self.voltage, self.voltage))
+            self.line_graph_off.setFillLevel(1.0)
+
+    def on_levels(self, on):
+        """
+        ON state (volts) as 0 / 1 levels, shape: (1, n) rows of levels ring buffer.
+        """
+        return (on != 0)[None]
+
+    def build_channels(self):
+        """
+        Channels 2..N (channel 1 is the ON state graph): ON state of the engine, phase shifted (delayed by 1/N period each).
+        Levels of all channels are generated as one array per tick, stored in a second ring buffer as 0 / 1 (uint8),
+        voltage and stacking offset are the transform of every channel graph.
+        """
+        for curve in self.channel_graphs:
+            self.plt.removeItem(curve)
+        self.bank, self.channel_samples, self.channel_graphs = None, None, ()
+        if self.channels < 2:
+            return
+        from channels import ShiftedChannels
+        self.bank = ShiftedChannels(self.engine, self.channels, first=1)
+        self.channel_samples = RingBuffer(len(self.samples), traces=len(self.bank), dtype=uint8)
+        self.channel_samples.fill(self.bank.bits(self.global_index_counter - len(self.samples), len(self.samples)))
+        self.channel_graphs = [
+            self.plt.plot(pen=mkPen(color=intColor(channel, self.channels))) for channel in range(1, self.channels)
+        ]
+        for channel, curve in enumerate(self.channel_graphs, start=1):
+            curve.setTransform(self.level_transform(self.voltage, channel * (self.voltage + 1)))     # Stacked above each other.
+            curve.setClipToView(True)
+        self.logger.debug("Channels: %s, Phase Shift: %s", self.channels, 360 / self.channels)
+
+    def update_downsampling(self):
+        """
+        Peak downsampling (min/max, keeps PWM edges) for graphs drawn from samples.
+        Auto: factor from samples in visible X range and plot width (pyqtgraph), zoomed in = every sample.
+        Edge plot and carrier have few points, never downsampled.
+        """
+        auto = not self.downsample
+        curves = [(self.line_graph, not self.edge_plot), (self.line_graph_off, not self.edge_plot), (self.sine_wave, True), (self.carrier_curve, False)]
+        for curve, from_samples in curves + [(curve, True) for curve in self.channel_graphs]:
+            if curve is not None:
+                curve.setDownsampling(ds=self.downsample or 1 if from_samples else 1, auto=auto and from_samples, method="peak")
+        self.logger.debug("Downsampling: %s", self.downsample or "Auto")
+
+    def record_frame(self, stats, start, computed, done):
+        """
+        Add tick timings to frame stats, Monitor is updated twice a second.
+        """
+        stats.record(start, computed, done, self.intervel / 1000)
+        if done - self.stats_shown >= 0.5:
+            self.stats_shown = done
+            self.monitor_textbox.setPlainText(f"{self.monitor_update()}\n{stats.report()}")
+
+    def frame_samples(self, now):
+        """
+        Number of samples to add in this tick, samples_per_frame or (speed mode) from wall clock time since last tick.
+        Never more than one window, rest is dropped.
+        """
+        elapsed, self.last_tick = now - self.last_tick, now
+        if not self.speed:
+            return self.samples_per_frame
+        self.sample_debt += elapsed * self.speed / self.step_size
+        count = int(self.sample_debt)
+        self.sample_debt -= count
+        return min(count, len(self.samples))
+
+    def measure_rate(self, now, count):
+        """
+        Simulated seconds per wall second, updated every second.
+        """
+        self.rate_samples += count
+        if now - self.rate_start >= 1.0:
+            self.sim_rate = self.rate_samples * self.step_size / (now - self.rate_start)
+            self.rate_start, self.rate_samples = now, 0
+            self.rate_label.setText(f"Speed: {self.sim_rate:.3g}x")
+            self.logger.debug("Simulated seconds per wall second: %s", self.sim_rate)
+
+    def fill_samples(self):
+        """
+        Create ring buffers for the scrolling window, filled with first window from engine.
+        """
+        window = self.engine.window()
+        self.samples = RingBuffer(window.shape[1], traces=FLOAT_ROWS)
+        self.samples.fill(window[:FLOAT_ROWS])
+        self.levels = RingBuffer(window.shape[1], dtype=uint8)
+        self.levels.fill(self.on_levels(window[PULSE_ON]))
+        if self.history is not None:        # New run from t = 0, earlier runs are kept.
+            self.start_history(len(self.history_segments))
+        if self.stream is not None:         # Clients see a new run, not a gap.
+            self.stream.publish(0, window[PULSE_ON], self.step_size, self.voltage, reset=True)
+        self.restart_producer()
+
+    def trace_update(self):
+        """
+        Check Buttons: Show/Hide OFF cycle, and Sine wave, Edge Plot.
+        Hidden graph is not computed or drawn, when Sine wave is shown again it is filled for the current window in one pass.
+        OFF state is drawn from ON state, nothing to compute.
+        """
+        self.graph_chk_off = self.chk_button.isChecked()
+        self.graph_chk_sine = self.chk_button_sine.isChecked()
+        if self.graph_chk_off and self.line_graph_off is None:
+            self.line_graph_off = self.trace_curve(brush=(255, 0, 0, 100))  # (r,g,b,a), a = fill level
+            self.update_level_transforms()
+        if self.graph_chk_sine and self.sine_wave is None:
+            self.sine_wave = self.trace_curve(pen=mkPen(color=(255, 0, 0)))
+        if self.sine_wave is not None and self.graph_chk_sine and not self.sine_wave.isVisible():
+            x_axis, levels = self.samples.view(X_AXIS), self.levels.view(0)
+            self.samples.write(SINE, self.engine.trace(SINE, x_axis, levels, self.global_index_counter - len(self.samples)))
+        for curve, shown in ((self.line_graph_off, self.graph_chk_off), (self.sine_wave, self.graph_chk_sine)):
+            if curve is not None:
+                curve.setVisible(shown)
+        self.show_carrier()
+        self.edge_plot = self.edge_button.isChecked()
+        self.restart_producer()
+        self.update_downsampling()
+        self.draw()
+        self.update_y_range()
+        self.logger.debug("Show Off cycle: %s, Show Sine Wave: %s, Edge Plot: %s", self.graph_chk_off, self.graph_chk_sine, self.edge_plot)
+
+    def show_carrier(self):
+        """
+        Carrier of modulation is shown with the reference (Show Reference): pulses are ON while carrier <= reference.
+        """
+        shown = self.graph_chk_sine and self.engine.modulation is not None
+        if shown and self.carrier_curve is None:
+            self.carrier_curve = self.trace_curve(pen=mkPen(color=(255, 160, 0), style=Qt.PenStyle.DashLine))
+        if self.carrier_curve is not None:
+            self.carrier_curve.setVisible(shown)
+
+    def trace_curve(self, **style):
+        """
+        New hidden graph, drawn only inside visible range.
+        """
+        curve = self.plt.plot(**style)
+        curve.setVisible(False)
+        curve.setClipToView(True)
+        return curve
+
+    def apply_changes(self, old_values):
+        """
+        Recompute only what changed values (engine.values() before configure()) need, scroll position is kept:
+        voltage = graph transforms (Sine rescaled), pulse width or modulation = ON levels (and reference) only, cycles = extend/trim window.
+        Time axis values (frequency, step size, accuracy) = new plot from t = 0.
+        """
+        changed = {name for name, value in self.engine.values().items() if old_values[name] != value}
+        if not changed:
+            return
+        start = index = self.global_index_counter       # Session record: next sample number, first sample number with new values.
+        self.update_legend()
+        self.log_values()
+        window_size = self.engine.window_size()
+        if changed & {"freq", "time_period", "step_size", "value_accuracy"}:
+            self.start_x_axis, self.end_x_axis = 0.0, (1/self.freq) * self.number_of_cycles
+            self.plt.setXRange(self.start_x_axis, self.end_x_axis)
+            # Generate X - Axis, and all traces.
+            self.fill_samples()
+            index = 0
+            self.logger.debug("x-Axis generated; Size: %s, Plot Start: 0.0 Plot End: %s", len(self.samples), self.time_period * self.number_of_cycles)
         else:
-            return 0.0
+            x_axis, levels = self.samples.view(X_AXIS), self.levels.view(0)
+            if changed & {"pulse_on_time", "modulation"} or not old_values["voltage"]:     # Levels of 0 V are all 0.
+                self.levels.write(0, self.engine.relevel(x_axis) != 0)
+            if "voltage" in changed and self.graph_chk_sine and old_values["voltage"] and "modulation" not in changed:
+                self.samples.write(SINE, self.samples.view(SINE) * (self.voltage / old_values["voltage"]))
+            elif changed & {"voltage", "modulation"} and self.graph_chk_sine:
+                self.samples.write(SINE, self.engine.trace(SINE, x_axis, levels, self.global_index_counter - len(self.samples)))
+            if window_size != len(self.samples):
+                self.resize_samples(window_size)
+        if "voltage" in changed:
+            self.update_level_transforms()
+        self.restart_producer()
+        self.build_channels()
+        self.update_downsampling()
+        self.draw()
+        if self.show_spectrum:
+            self.refresh_spectrum(perf_counter())
+        if self.session is not None:
+            from session import VALUES
+            self.session.record(VALUES, self.engine, start, index)
+        self.logger.debug("Changed values: %s", sorted(changed))
+
+    def resize_samples(self, window_size):
+        """
+        New number of cycles: more = next samples are added (start of window is kept), less = oldest are dropped.
+        """
+        block = self.engine.next_block(window_size - len(self.samples)) if window_size > len(self.samples) else None
+        self.samples.resize(window_size, None if block is None else block[:FLOAT_ROWS])
+        self.levels.resize(window_size, None if block is None else self.on_levels(block[PULSE_ON]))
+        if self.history is not None and block is not None:
+            self.history.append(block[PULSE_ON])
+        if self.stream is not None and block is not None:
+            self.stream.publish(self.global_index_counter - block.shape[1], block[PULSE_ON], self.step_size, self.voltage)
+        self.start_x_axis = float(self.samples.view(X_AXIS)[0])
+        self.end_x_axis = self.start_x_axis + self.time_period * self.number_of_cycles
+        self.plt.setXRange(self.start_x_axis, self.end_x_axis)
+
+    def update_y_range(self):
+        """
+        Y axis from 0, or from -voltage when sine wave is shown.
+        """
+        self.plt.setYRange(-(self.voltage + 2) if self.graph_chk_sine else 0, self.voltage + 2 + (self.channels - 1) * (self.voltage + 1))
+
+    def log_values(self):
+        """
+        INFO: All signal values, message is formatted later (by log writer).
+        """
+        self.logger.info(VALUES_LOG, {
+            "freq": self.freq, "time_period": self.time_period, "voltage": self.voltage, "duty": self.duty,
+            "step_size": self.step_size, "intervel": self.intervel, "pulse_on_time": self.pulse_on_time,
+            "number_of_cycles": self.number_of_cycles, "start_x_axis": self.start_x_axis, "end_x_axis": self.end_x_axis,
+            "value_accuracy": self.value_accuracy,
+        })
 
     def update_legend(self):
         """
@@ -243,7 +587,50 @@ class MainWindow(QMainWindow):
         self.legend.addItem(self.line_graph, f"Frequency: {self.freq} Hz")
         self.legend.addItem(self.line_graph, f"Voltage: {self.voltage} VDC")
         self.legend.addItem(self.line_graph, f"Pulse ON: {self.pulse_on_time:0.{self.value_accuracy}f} Sec")
-        self.logger.info(f"Legend Updated-- Frequnecy: {self.freq}, Voltage: {self.voltage}, Pulse ON: {self.pulse_on_time:0.9f}")
+        if self.engine.modulation is not None:
+            modulation = self.engine.modulation
+            self.legend.addItem(self.line_graph, f"Modulation: {modulation.freq} Hz, index {modulation.index}, {modulation.carrier} carrier")
+        self.logger.info("Legend Updated-- Frequnecy: %s, Voltage: %s, Pulse ON: %0.9f", self.freq, self.voltage, self.pulse_on_time)
+
+    def values_changed(self):
+        """
+        Update button, cycles dial: new values from inputs, applied by apply_updates().
+        """
+        self.schedule_update("values")
+
+    def traces_changed(self):
+        """
+        Check Buttons: Show/Hide OFF cycle, and Sine wave, Edge Plot, applied by apply_updates().
+        """
+        self.schedule_update("traces")
+
+    def schedule_update(self, kind):
+        """
+        Coalesce bursts of changes (e.g. spinning the cycles dial): applied at once when nothing was applied in the last
+        update_delay ms, else latest values of all inputs are applied together when update_timer fires, one rebuild per frame.
+        """
+        self.pending_updates.add(kind)
+        if self.update_timer.isActive():
+            return
+        wait = self.update_delay - (perf_counter() - self.last_update) * 1000
+        if wait <= 0:
+            self.apply_updates()
+        else:
+            self.update_timer.start(int(wait) + 1)
+
+    def apply_updates(self):
+        """
+        Apply pending changes: traces (check buttons), then values (inputs, and cycles dial). Counts rebuilds and time taken.
+        """
+        start = perf_counter()
+        kinds, self.pending_updates = self.pending_updates, set()
+        if "traces" in kinds:
+            self.trace_update()
+        if "values" in kinds:
+            self.button_update()
+        self.last_update = perf_counter()
+        self.rebuilds += 1
+        self.rebuild_time += self.last_update - start
 
     def dailer_button(self):
         """
@@ -265,7 +652,7 @@ class MainWindow(QMainWindow):
         Dailer button, To control frequency, Number of cycles you want to show.
         """
         self.dial_freq = QDial()
-        self.dial_freq.setObjectName("freq_dial")       # For sender().objectName().
+        self.dial_freq.setObjectName("freq_dial")
         self.dial_freq.setStyleSheet("background-color: #B8B8B8")
         self.dial_freq.setFixedHeight(100)
         self.dial_freq.setFixedWidth(100)
@@ -283,7 +670,7 @@ class MainWindow(QMainWindow):
         self.intervel = self.dial.value()
         self.label_interval.setText(f"Time (Delay): {self.intervel}ms")
         self.timer.setInterval(self.intervel)
-        self.logger.debug(f"Dial: Time Delay Rotated Value: {self.intervel}")
+        self.logger.debug("Dial: Time Delay Rotated Value: %s", self.intervel)
 
     def dail_update_interval_freq(self):
         """
@@ -291,9 +678,8 @@ class MainWindow(QMainWindow):
         """
         intervel_freq = self.dial_freq.value()
         self.label_frequency.setText(f"Cycles: {intervel_freq}")
-        self.number_of_cycles = intervel_freq
-        self.button_update()
-        self.logger.debug(f"Dial: Frequency Rotated Value: {intervel_freq}")
+        self.values_changed()   # Sets number_of_cycles from dial, once per burst of detents.
+        self.logger.debug("Dial: Frequency Rotated Value: %s", intervel_freq)
 
     def variable_input(self):
         """
@@ -319,6 +705,17 @@ class MainWindow(QMainWindow):
         form_layout.addWidget(freq_label, 1, 1)
         form_layout.addWidget(self.freq_edit, 1, 2, alignment=Qt.AlignmentFlag.AlignLeft)
 
+        # Input field: Samples per frame, number, "Real-time" or speed multiple (x10).
+        self.frame_edit = QComboBox()
+        self.frame_edit.setStyleSheet("background-color : #B8B8B8")
+        self.frame_edit.setEditable(True)
+        self.frame_edit.addItems(["1", "10", "100", "1000", "Real-time", "x0.1", "x10"])
+        self.frame_edit.setFixedWidth(80)
+        self.frame_edit.currentTextChanged.connect(self.frame_update)
+        frame_label = QLabel("Samples/Frame:")
+        form_layout.addWidget(frame_label, 2, 1)
+        form_layout.addWidget(self.frame_edit, 2, 2, alignment=Qt.AlignmentFlag.AlignLeft)
+
         # Input field: For Duty Cycle.
         self.duty_edit = QLineEdit()
         self.duty_edit.setStyleSheet("background-color : #B8B8B8")
@@ -346,11 +743,43 @@ class MainWindow(QMainWindow):
         form_layout.addWidget(step_size_label, 5, 1)
         form_layout.addWidget(self.step_size_edit, 5, 2, alignment=Qt.AlignmentFlag.AlignLeft)
 
+        # Input field: Downsampling of graphs drawn from samples, Auto = from plot width.
+        self.downsample_edit = QComboBox()
+        self.downsample_edit.setStyleSheet("background-color : #B8B8B8")
+        self.downsample_edit.addItems(["Auto", "Off", "2", "4", "8", "16", "32", "64"])
+        self.downsample_edit.setFixedWidth(80)
+        self.downsample_edit.currentTextChanged.connect(self.downsample_update)
+        downsample_label = QLabel("Downsample:")
+        form_layout.addWidget(downsample_label, 8, 1)
+        form_layout.addWidget(self.downsample_edit, 8, 2, alignment=Qt.AlignmentFlag.AlignLeft)
+
+        # Input field: Number of PWM channels, phase shifted and stacked.
+        self.channels_edit = QComboBox()
+        self.channels_edit.setEditable(True)
+        self.channels_edit.setStyleSheet("background-color : #B8B8B8")
+        self.channels_edit.addItems(["1", "2", "3", "6", "8", "12", "16"])
+        self.channels_edit.setFixedWidth(80)
+        self.channels_edit.currentTextChanged.connect(self.channels_update)
+        channels_label = QLabel("Channels:")
+        form_layout.addWidget(channels_label, 9, 1)
+        form_layout.addWidget(self.channels_edit, 9, 2, alignment=Qt.AlignmentFlag.AlignLeft)
+
+        # Input field: Modulation (SPWM), sine reference compared with carrier: "Hz", "Hz, index" or "Hz, index, sawtooth".
+        self.modulation_edit = QComboBox()
+        self.modulation_edit.setEditable(True)
+        self.modulation_edit.setStyleSheet("background-color : #B8B8B8")
+        self.modulation_edit.addItems(["Off", "50", "60", "400", "50, 1.0", "50, 0.8, sawtooth"])
+        self.modulation_edit.setFixedWidth(80)
+        self.modulation_edit.currentTextChanged.connect(self.modulation_update)
+        modulation_label = QLabel("Modulation:")
+        form_layout.addWidget(modulation_label, 10, 1)
+        form_layout.addWidget(self.modulation_edit, 10, 2, alignment=Qt.AlignmentFlag.AlignLeft)
+
         # Push Button: For Re Plotting all Graphs based on the inputs from GUI.
         self.button = QPushButton("Update")
-        self.button.setObjectName("Update")         # Used for sender().objectName()
+        self.button.setObjectName("Update")
         self.button.setStyleSheet("background-color: #B8B8B8")
-        self.button.clicked.connect(self.button_update)
+        self.button.clicked.connect(self.values_changed)
         form_layout.addWidget(self.button, 6, 1, 2, 2)
 
         # Push Button: Pause the Graph.
@@ -362,19 +791,55 @@ class MainWindow(QMainWindow):
 
         # Check Button:  For showing the OFF state area of Pulse, Red color graph.
         self.chk_button = QCheckBox("Show OFF Cycle")
-        self.chk_button.stateChanged.connect(self.button_update)
+        self.chk_button.stateChanged.connect(self.traces_changed)
         form_layout.addWidget(self.chk_button, 0, 0)
 
         # Check Button:  For Sine wave show/hide.
         self.chk_button_sine = QCheckBox("Show Sine Wave")
-        self.chk_button_sine.stateChanged.connect(self.button_update)
+        self.chk_button_sine.stateChanged.connect(self.traces_changed)
         form_layout.addWidget(self.chk_button_sine, 1, 0)
 
+        # Check Button: Draw ON/OFF state from pulse edges (few points per cycle), or from every sample.
+        self.edge_button = QCheckBox("Edge Plot")
+        self.edge_button.setChecked(self.edge_plot)
+        self.edge_button.stateChanged.connect(self.traces_changed)
+        form_layout.addWidget(self.edge_button, 8, 0)
+
+        # Check Button: Generate samples ahead in background thread.
+        self.background_button = QCheckBox("Background")
+        self.background_button.stateChanged.connect(self.background_update)
+        form_layout.addWidget(self.background_button, 9, 0)
+
+        # Check Button: Record parameter changes to session file, for replay without GUI (session.py).
+        self.record_button = QCheckBox("Record")
+        self.record_button.stateChanged.connect(self.record_update)
+        form_layout.addWidget(self.record_button, 10, 0)
+
+        # Check Button: Spectrum pane, FFT of window with harmonics of ideal PWM.
+        self.spectrum_button = QCheckBox("Spectrum")
+        self.spectrum_button.stateChanged.connect(self.spectrum_update)
+        form_layout.addWidget(self.spectrum_button, 11, 0)
+
+        # Check Button: Keep whole run on disk, paused plot can be zoomed out over it.
+        self.history_button = QCheckBox("History")
+        self.history_button.stateChanged.connect(self.history_update)
+        form_layout.addWidget(self.history_button, 12, 0)
+
+        # Check Button: Send every new block to local clients (stream.py), TCP port stream_port.
+        self.stream_button = QCheckBox("Stream")
+        self.stream_button.stateChanged.connect(self.stream_update)
+        form_layout.addWidget(self.stream_button, 13, 0)
+
         # Label: For warning message, which will be shown when Exception is raised.
         self.warning = QLabel()
         self.warning.setStyleSheet("color: red")
         form_layout.addWidget(self.warning, 3, 0)
 
+        # Label: Measured simulated seconds per wall second.
+        self.rate_label = QLabel(f"Speed: {self.sim_rate:.3g}x")
+        self.rate_label.setStyleSheet("background-color: #000000; color: #7CFC00")
+        form_layout.addWidget(self.rate_label, 2, 0)
+
         # Label: For Step Size suggestion MIN.
         self.step_size_label = QLabel(f"Step Size (min): {self.suggested_step}")
         self.step_size_label.setStyleSheet("background-color: #000000; color: #7CFC00")
@@ -410,8 +875,45 @@ class MainWindow(QMainWindow):
         log_open_button.clicked.connect(self.open_logs)
         log_grid.addWidget(log_open_button, 0, 2)
 
+        # Check Button: Per tick timings in Monitor.
+        self.stats_button = QCheckBox("Frame Stats")
+        self.stats_button.stateChanged.connect(self.stats_update)
+        log_grid.addWidget(self.stats_button, 0, 3)
+
         self.grid_layout.addLayout(log_grid, 1, 1, alignment=Qt.AlignmentFlag.AlignCenter)
 
+    def stats_update(self):
+        """
+        Check Button: Start/Stop recording frame stats.
+        """
+        if self.stats_button.isChecked():
+            self.frame_stats = FrameStats()
+        else:
+            self.frame_stats = None
+            self.monitor_textbox.setPlainText(self.monitor_update())
+        self.logger.debug("Frame Stats: %s", self.stats_button.isChecked())
+
+    def closeEvent(self, event):
+        """
+        Write frame stats to file on exit.
+        """
+        if self.frame_stats is not None and self.frame_stats_file:
+            self.frame_stats.dump(self.frame_stats_file)
+            self.logger.info("Frame stats written to %s", self.frame_stats_file)
+        if self.producer is not None:
+            self.producer.stop()
+            self.producer = None
+        if self.session is not None:
+            self.session.close(self.engine)
+            self.session = None
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+        super().closeEvent(event)
+
     def option(self, option_num):
         """
         Drop  Down: Logs
@@ -423,6 +925,7 @@ class MainWindow(QMainWindow):
                 self.logger.setLevel(logging.DEBUG)
 
     def open_logs(self):
+        from subprocess import run
         run(["notepad.exe", "simulator.log"])
 
     def monitor(self):
@@ -442,6 +945,7 @@ class MainWindow(QMainWindow):
         self.grid_layout.addLayout(monitor_grid, 3, 1, alignment=Qt.AlignmentFlag.AlignCenter)
 
     def monitor_update(self):
+        templates = period_template.cache_info()
         return f"""\
         Voltage:        {self.voltage} VDC
         Frequency:      {self.freq} Hz
@@ -450,7 +954,215 @@ class MainWindow(QMainWindow):
         Pulse width:    {self.pulse_on_time} Sec
         Step Size:      {self.step_size}
         No. Cycles:     {self.number_of_cycles}
-        Accuracy Value: {self.value_accuracy} Decimals"""
+        Accuracy Value: {self.value_accuracy} Decimals
+        Templates:      {templates.hits} hits / {templates.misses} misses"""
+
+    def downsample_update(self, text):
+        """
+        Downsample input: "Auto", "Off" or factor.
+        """
+        self.downsample = 0 if text == "Auto" else 1 if text == "Off" else int(text)
+        self.update_downsampling()
+
+    def spectrum_update(self):
+        """
+        Check Button: Show/Hide spectrum pane, below the plot.
+        """
+        self.show_spectrum = self.spectrum_button.isChecked()
+        if self.show_spectrum and self.spectrum_plot is None:
+            self.spectrum_plot = PlotWidget()
+            self.spectrum_plot.showGrid(x=True, y=True)
+            self.spectrum_plot.setLabel("left", "Amplitude (V)", color="red", size="14px")
+            self.spectrum_plot.setLabel("bottom", "Frequency (Hz)", color="red", size="14px")
+            self.spectrum_plot.addLegend(labelTextColor="w", offset=(-1, 1))
+            self.spectrum_curve = self.spectrum_plot.plot(pen=mkPen(color=(255, 255, 0)), name="Measured")
+            self.harmonics_curve = self.spectrum_plot.plot(pen=None, symbol="o", symbolSize=6, symbolBrush=(0, 255, 0), name="Ideal PWM")
+            self.grid_layout.addWidget(self.spectrum_plot, 2, 0, 1, 4)
+        if self.spectrum_plot is not None:
+            self.spectrum_plot.setVisible(self.show_spectrum)
+        if self.show_spectrum:
+            self.refresh_spectrum(perf_counter())
+        self.logger.debug("Spectrum: %s", self.show_spectrum)
+
+    def refresh_spectrum(self, now):
+        """
+        Spectrum of ON state in window, up to HARMONICS of fundamental (PWM frequency, or modulation frequency).
+        Whole periods of fundamental are used when a period is a whole number of samples, else Hann window.
+        Ideal PWM harmonics (fixed duty only) are drawn as points, THD of both in title.
+        """
+        from spectrum import HARMONICS, harmonic_amplitudes, pwm_harmonics, spectrum, thd
+        self.spectrum_shown = now
+        base, modulation = self.engine.time_base(), self.engine.modulation
+        fundamental = self.freq if modulation is None else modulation.freq
+        period = base.period if modulation is None else base.unit // modulation.freq if base.unit % modulation.freq == 0 else None
+        period_samples = None if period is None else base.samples_per_period(period)
+        frequencies, amplitudes = spectrum(self.levels.view(0), self.step_size, period_samples)
+        amplitudes *= abs(self.voltage)                                 # Spectrum of 0 / 1 levels, scaled to volts.
+        shown = frequencies <= (HARMONICS + 0.5) * fundamental
+        self.spectrum_curve.setData(frequencies[shown], amplitudes[shown])
+        measured = thd(harmonic_amplitudes(frequencies, amplitudes, fundamental))
+        if modulation is None:
+            ideal = pwm_harmonics(self.voltage, self.pulse_on_time / self.time_period)
+            self.harmonics_curve.setData(arange(1, HARMONICS + 1) * fundamental, ideal)
+            self.spectrum_plot.setTitle(f"THD: {measured:.1%}   Ideal PWM: {thd(ideal):.1%}   ({HARMONICS} harmonics)", color="w")
+        else:
+            self.harmonics_curve.setData([], [])
+            self.spectrum_plot.setTitle(f"THD: {measured:.1%}   (fundamental {fundamental} Hz, {HARMONICS} harmonics)", color="w")
+
+    def history_update(self):
+        """
+        Check Button: Start/Stop keeping history, starts with shown window.
+        """
+        if self.history_button.isChecked():
+            self.start_history()
+        elif self.history is not None:
+            if self.history_curve is not None and self.history_curve.isVisible():
+                self.show_history(False)
+            self.history.close()
+            self.history = None
+        self.logger.debug("History: %s", self.history is not None)
+
+    def start_history(self, segment=0):
+        """
+        New history segment from oldest sample of window, 0 = new history. Next segments (new time axis after restart
+        from t = 0) are new files, earlier ones are kept, listed with start and step size in history_file.json.
+        """
+        from history import HistoryStore, segment_path, write_segments
+        if self.history is not None:
+            self.history.close()
+        self.history = HistoryStore(segment_path(self.history_file, segment), start=self.global_index_counter - len(self.samples))
+        self.history.append(self.levels.view(0) * self.voltage)
+        self.history_segments = [*self.history_segments[:segment], {"file": self.history.path, "start": self.history.start, "step_size": self.step_size}]
+        write_segments(self.history_file, self.history_segments)
+
+    def show_history(self, shown):
+        """
+        Paused: ON state graph is replaced by history graph, drawn again for every new x range (zoom, pan).
+        """
+        view_box = self.plt.plotItem.vb
+        if shown:
+            if self.history_curve is None:
+                self.history_curve = self.plt.plot(pen=mkPen(color=(0, 255, 0)), fillLevel=0.0, brush=(0, 255, 0, 100))
+            view_box.sigXRangeChanged.connect(self.draw_history)
+            self.draw_history()
+        else:
+            view_box.sigXRangeChanged.disconnect(self.draw_history)
+        self.history_curve.setVisible(shown)
+        self.line_graph.setVisible(not shown)
+
+    def draw_history(self):
+        """
+        History in visible x range, samples when zoomed in, else min/max envelope, about 2 points per pixel.
+        """
+        (start, end), _ = self.plt.viewRange()
+        first = int(start / self.step_size) - self.history.start
+        index, values = self.history.envelope(first, int(end / self.step_size) + 2 - self.history.start, max(self.plt.width(), 100))
+        self.history_curve.setData((index + self.history.start) * self.step_size, values)
+
+    def stream_update(self):
+        """
+        Check Button: Start/Stop sample server, clients get blocks from next tick.
+        """
+        if self.stream_button.isChecked():
+            from stream import SampleServer
+            try:
+                self.stream = SampleServer(port=self.stream_port)
+            except OSError as error:
+                self.warning.setText(f"Stream: {error.strerror}")
+                self.stream_button.setChecked(False)
+                return
+        elif self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+        self.logger.debug("Stream: %s, Port: %s", self.stream is not None, self.stream_port)
+
+    def record_update(self):
+        """
+        Check Button: Start/Stop recording session, starts with values of shown window.
+        """
+        if self.record_button.isChecked():
+            from session import SessionRecorder, VALUES
+            try:
+                self.session = SessionRecorder(self.session_file)
+            except ValueError as error:         # Session file of older version is not appended to.
+                self.warning.setText(f"Record: {error}")
+                self.record_button.setChecked(False)
+                return
+            self.session.record(VALUES, self.engine, self.global_index_counter - len(self.samples), self.global_index_counter - len(self.samples))
+        elif self.session is not None:
+            self.session.close(self.engine)
+            self.session = None
+        self.logger.debug("Record session: %s", self.session is not None)
+
+    def background_update(self):
+        """
+        Check Button: Start/Stop background producer, it continues after newest shown sample.
+        """
+        if self.background_button.isChecked():
+            from producer import BlockProducer
+            self.producer = BlockProducer(self.engine)
+        elif self.producer is not None:
+            self.producer.stop()
+            self.producer = None
+        self.logger.debug("Background producer: %s", self.producer is not None)
+
+    def channels_update(self, text):
+        """
+        Channels input: 1 - 64.
+        """
+        if not text.isdecimal() or not 1 <= int(text) <= 64:
+            self.warning.setText("Channels: 1 - 64")
+            return
+        self.warning.clear()
+        self.channels = int(text)
+        self.build_channels()
+        self.update_downsampling()
+        self.draw()
+        self.update_y_range()
+
+    def modulation_update(self, text):
+        """
+        Modulation input: "Off", "Hz" (index 0.8) or "Hz, index" (0 - 1), optional carrier last ("triangle" default, "sawtooth").
+        Sine check button shows the reference and carrier when modulated.
+        """
+        from modulation import CARRIERS, TRIANGLE, Modulation
+        try:
+            fields = [field.strip() for field in text.split(",")] if text.strip() != "Off" else None
+            carrier = fields.pop() if fields is not None and len(fields) > 1 and fields[-1] in CARRIERS else TRIANGLE
+            values = None if fields is None else [float(value) for value in fields]
+            modulation = None if values is None else Modulation(*values, carrier=carrier) if len(values) <= 2 else None
+            if values is not None and modulation is None:
+                raise ValueError
+        except ValueError:
+            self.warning.setText("Modulation: Off, or Hz, index (0 - 1), carrier (triangle, sawtooth)")
+            return
+        self.warning.clear()
+        old_values = self.engine.values()
+        self.engine.modulation = modulation
+        self.chk_button_sine.setText("Show Sine Wave" if modulation is None else "Show Reference")
+        self.show_carrier()
+        self.apply_changes(old_values)
+
+    def frame_update(self, text):
+        """
+        Samples per frame input: "25" = fixed samples per tick, "Real-time" = x1, "x10" = ten times real time.
+        """
+        try:
+            if text == "Real-time":
+                speed, samples_per_frame = 1.0, self.samples_per_frame
+            elif text.startswith("x"):
+                speed, samples_per_frame = float(text[1:]), self.samples_per_frame
+            else:
+                speed, samples_per_frame = 0.0, int(text)
+            if (text.startswith("x") and speed <= 0) or samples_per_frame < 1:
+                raise ValueError
+        except ValueError:
+            self.warning.setText("Samples/Frame: 1, 2.. or x0.5, x2..")
+            return
+        self.warning.clear()
+        self.speed, self.samples_per_frame = speed, samples_per_frame
+        self.sample_debt, self.last_tick = 0.0, perf_counter()
+        self.logger.debug("Samples per frame: %s, Speed: %s", self.samples_per_frame, self.speed)
 
     def pause_button_update(self):
         """
@@ -459,16 +1171,28 @@ class MainWindow(QMainWindow):
         if self.pause_button.isChecked():
             self.pause_button.setText("Resume")
             self.timer.stop()
+            if self.session is not None:
+                from session import PAUSE
+                self.session.record(PAUSE, self.engine, self.global_index_counter)
+            if self.history is not None:
+                self.show_history(True)
         else:
             self.pause_button.setText("Pause")
+            self.last_tick = perf_counter()     # Paused time is not simulated.
+            if self.history_curve is not None and self.history_curve.isVisible():
+                self.show_history(False)
+            if self.session is not None:
+                from session import RESUME
+                self.session.record(RESUME, self.engine, self.global_index_counter)
+            if self.frame_stats is not None:
+                self.frame_stats.last_start = None
             self.timer.start()
-        self.logger.debug(f"Pause Button Pressed, State: {self.pause_button.isChecked()},Text : {self.pause_button.text()}")
+        self.logger.debug("Pause Button Pressed, State: %s,Text : %s", self.pause_button.isChecked(), self.pause_button.text())
 
     def button_update(self,):
         """
         This is the Update Button, which will re plot the graphs for new values.
         """
-        # Use can "Button groups" or sender() for large number of buttons in order to know which button is clicked.
         self.logger.debug("Update button pushed..")
 
         # Update exceptions.
@@ -492,64 +1216,21 @@ class MainWindow(QMainWindow):
                 raise FloatDuty
             if float(self.step_size_edit.text()) < 0 or float(self.step_size_edit.text()) == 1:
                 raise StepNegative
-            """
-            I have used objectName, as you can set it for a button of any type,
-            If you are dealing with just Button not dailers than you can use sender().text(),
-            sender().text() can be used with any button which has setText() method.
-            """
-            if self.sender().objectName() in ["Update", "freq_dial"]:
-                self.logger.debug(f"Button used: {self.sender().objectName()}")
-                # print(self.sender())
-                # print(self.sender().objectName())
-                self.voltage = float(self.voltage_edit.text() if len(self.voltage_edit.text()) else self.voltage)
-                self.freq = int(self.freq_edit.text() if len(self.freq_edit.text()) else self.freq)
-                self.suggested_accuracy = 2 + len(f"{self.freq}") if self.freq % 2 == 0 else 1 + len(f"{self.freq}")  # Increase accuracy for odd freq.
-                self.value_accuracy = self.suggested_accuracy if int(self.accuracy_edit.text()) < self.suggested_accuracy else int(self.accuracy_edit.text())
-                self.time_period = round(1/self.freq, self.value_accuracy)
-                self.duty = int(self.duty_edit.text() if len(self.duty_edit.text()) else self.duty)
-                self.suggested_step = 1/10 ** (len(f"{self.freq}") + 2)
-                self.step_size = self.suggested_step if float(self.step_size_edit.text()) > self.suggested_step else float(self.step_size_edit.text())
-                self.step_size_edit.setText(f"{self.step_size}")
-                self.accuracy_edit.setText(f"{self.value_accuracy}")
-
-                self.global_index_counter = 0.0
-                self.start_x_axis, self.end_x_axis = 0.0, (1/self.freq) * self.number_of_cycles
-                self.plt.setXRange(self.start_x_axis, self.end_x_axis)
-
-                self.pulse_on_time = round(1 / self.freq * (self.duty / 100), self.value_accuracy)
-                self.update_legend()
-                self.logger.info(
-                    f"""Initialized with values....
-                    Frequency: {self.freq}
-                    Time Period: {self.time_period}
-                    Voltage: {self.voltage}
-                    Duty Cycle: {self.duty}
-                    Step Size: {self.step_size}
-                    Intervel: {self.intervel}
-                    Pulse width: {self.pulse_on_time}
-                    No. Cycles: {self.number_of_cycles}
-                    Start x-axis: {self.start_x_axis}
-                    End x-axis: {self.end_x_axis}
-                    Round Value point: {self.value_accuracy}
-                    Global Counter: {self.global_index_counter}
-                    """
-                )
-                # Generate X - Axis.
-                self.x_axis = list(round(n, self.value_accuracy) for n in arange(0.0, self.time_period * self.number_of_cycles, self.step_size))
-                self.y_axis_on = self.y_axis()
-                self.logger.debug(
-                    f"""
-                    x-Axis generated; Size: {len(self.x_axis)},
-                    Plot Start: {0.0} Plot End: {self.time_period * self.number_of_cycles}
-                    """
-                )
-
-            if self.chk_button.isChecked():
-                self.logger.debug("Show Off cycle: Checked")
-                self.y_axis_off = list(map(lambda v: 0.0 if v == self.voltage else self.voltage, self.y_axis_on))
-            if self.chk_button_sine.isChecked():
-                self.logger.debug("Show Sine Wave: Checked")
-                self.sine_y = [self.voltage * sin(2 * pi * self.freq * value) for value in self.x_axis]
+
+            # Called by apply_updates() for Update button, and cycles dial only, latest values of all inputs.
+            old_values = self.engine.values()
+            self.engine.configure(
+                voltage=self.voltage_edit.text() if len(self.voltage_edit.text()) else None,
+                freq=self.freq_edit.text() if len(self.freq_edit.text()) else None,
+                duty=self.duty_edit.text() if len(self.duty_edit.text()) else None,
+                step_size=self.step_size_edit.text(),
+                value_accuracy=self.accuracy_edit.text(),
+                number_of_cycles=self.dial_freq.value(),
+            )
+            self.step_size_edit.setText(f"{self.step_size}")
+            self.accuracy_edit.setText(f"{self.value_accuracy}")
+
+            self.apply_changes(old_values)
 
             # Update Monitor
             self.monitor_textbox.clear()
@@ -568,13 +1249,15 @@ class MainWindow(QMainWindow):
 
         self.step_size_label.setText(f"Step Size (min): \n{self.step_size}")   # Update label of step size.suggested_step
         self.accuracy_label.setText(f"Accuracy (min): \n{self.suggested_accuracy}")   # Update label of step size.suggested_step
-        self.plt.setYRange(0, self.voltage + 2)
-
-        if self.graph_chk_sine:
-            self.plt.setYRange(-(self.voltage + 2), self.voltage + 2)
+        self.update_y_range()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PWM Simulator/Generator.")
+    parser.add_argument("--startup-timing", action="store_true", help="Print time of startup phases, up to first frame with data")
+    args = parser.parse_args()
+    startup = StartupTimer() if args.startup_timing else None
+
     app = QApplication([])
 
     # You can also changle color by using self.setStyleSheet() inside __init__().
@@ -589,14 +1272,11 @@ if __name__ == "__main__":
     palette.setColor(QPalette.ColorRole.HighlightedText, QColor(0, 0, 0))
     app.setPalette(palette)
 
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.INFO)
-
-    handle = logging.FileHandler(filename="simulator.log")
-    format = logging.Formatter("[%(levelname)s]: %(asctime)s: %(funcName)s: %(message)s")
-    handle.setFormatter(format)
-    logger.addHandler(handle)
+    logger, listener = setup_logging()
+    if startup is not None:
+        startup.mark("application")
 
-    main = MainWindow(logger)
+    main = MainWindow(logger, deferred=True, startup=startup)   # Shown before samples are generated.
     main.show()
     app.exec()
+    listener.stop()
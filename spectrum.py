@@ -0,0 +1,51 @@
+"""
+Spectrum and harmonics of PWM samples, NumPy FFT. No GUI code here.
+Ideal PWM (ON from start of cycle for duty D): harmonic n amplitude = 2 * V / (n * pi) * |sin(n * pi * D)|, DC = V * D.
+"""
+from numpy import abs as absolute, arange, around, hanning, pi, sin, sqrt
+from numpy.fft import rfft, rfftfreq
+
+HARMONICS = 50                      # Harmonics in THD, and shown in spectrum.
+
+
+def spectrum(levels, step_size, period_samples=None):
+    """
+    Single sided amplitude spectrum of levels (sampled every step_size), returns (frequencies, amplitudes).
+    period_samples: samples in one period of fundamental, newest whole periods are used (no leakage), None = Hann window.
+    """
+    if period_samples and len(levels) >= period_samples:
+        levels = levels[len(levels) % period_samples:]
+        window_sum = len(levels)
+    else:
+        window = hanning(len(levels))
+        levels = levels * window
+        window_sum = window.sum()
+    amplitudes = absolute(rfft(levels)) * (2 / window_sum)
+    amplitudes[0] /= 2                                          # DC is not doubled.
+    return rfftfreq(len(levels), step_size), amplitudes
+
+
+def harmonic_amplitudes(frequencies, amplitudes, fundamental, harmonics=HARMONICS):
+    """
+    Amplitude of fundamental (n = 1) .. harmonics from spectrum, nearest bin. Harmonics above Nyquist are left out.
+    """
+    resolution = frequencies[1] - frequencies[0] if len(frequencies) > 1 else 1.0
+    bins = around(arange(1, harmonics + 1) * fundamental / resolution).astype(int)
+    return amplitudes[bins[bins < len(amplitudes)]]
+
+
+def thd(harmonics):
+    """
+    Total harmonic distortion (0 - 1..) of amplitudes, harmonics[0] = fundamental.
+    """
+    if len(harmonics) < 2 or not harmonics[0]:
+        return 0.0
+    return float(sqrt((harmonics[1:] ** 2).sum()) / harmonics[0])
+
+
+def pwm_harmonics(voltage, duty, harmonics=HARMONICS):
+    """
+    Analytic amplitudes of harmonics 1.. of ideal PWM, duty 0 - 1.
+    """
+    n = arange(1, harmonics + 1)
+    return 2 * voltage / (n * pi) * absolute(sin(n * pi * duty))
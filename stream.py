@@ -0,0 +1,204 @@
+"""
+Stream sample blocks to local tools (logic analyzer UI, HIL test harness) over TCP or a Unix socket.
+Every block is one binary frame: FRAME header, then count levels, float32 volts or uint8 (0 / 1, scale by voltage).
+A frame with RESET in its flags starts a new run (time axis from t = 0, new step size), sample numbers start again.
+The server runs an asyncio loop in its own thread, publish() never waits: every client has a bounded queue,
+blocks for a slow client are dropped (the client sees a gap in sample numbers), the GUI timer is never stalled.
+
+    python stream.py serve --freq 1000 --duty 25 --port 5555       # Without GUI, real time.
+    python stream.py listen --port 5555
+"""
+import argparse
+import asyncio
+import struct
+import sys
+
+from threading import Event, Thread
+from time import perf_counter, sleep
+from numpy import float32, frombuffer, uint8
+from engine import PWMEngine, PULSE_ON
+
+FLOAT32, UINT8 = 0, 1
+RESET = 1                                   # Flag: first frame of a new run, not a gap.
+# start (sample number of first level), count, step_size (Sec, time = sample number * step size), voltage, format, flags.
+FRAME = struct.Struct("<QIddBB")
+
+
+def encode(start, levels, step_size, voltage, level_format=FLOAT32, reset=False):
+    """
+    Frame of one block of ON state levels.
+    """
+    payload = levels.astype(float32) if level_format == FLOAT32 else (levels != 0).astype(uint8)
+    return FRAME.pack(start, len(levels), step_size, voltage, level_format, RESET if reset else 0) + payload.tobytes()
+
+
+class SampleServer:
+    """
+    TCP (host, port) or Unix socket (path) server, port 0 = any free port (see address).
+    depth: frames queued per client, more are dropped for that client.
+    """
+    def __init__(self, host="127.0.0.1", port=5555, path=None, level_format=FLOAT32, depth=16):
+        self.level_format = level_format
+        self.depth = depth
+        self.clients = set()                # Queue of every connected client.
+        self.sent = self.dropped = 0        # Frames (all clients).
+        self.error = None
+        self.loop = asyncio.new_event_loop()
+        started = Event()
+        self.thread = Thread(target=self.run, args=(host, port, path, started), name="SampleServer", daemon=True)
+        self.thread.start()
+        started.wait()
+        if self.error is not None:
+            self.thread.join()
+            raise self.error
+
+    def run(self, host, port, path, started):
+        asyncio.set_event_loop(self.loop)
+        try:
+            serving = asyncio.start_unix_server(self.serve, path) if path else asyncio.start_server(self.serve, host, port)
+            server = self.loop.run_until_complete(serving)
+        except OSError as error:
+            self.error = error
+            started.set()
+            self.loop.close()
+            return
+        self.address = server.sockets[0].getsockname()
+        started.set()
+        self.loop.run_forever()
+        server.close()
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+
+    async def serve(self, reader, writer):
+        """
+        One client: frames from its queue, written as fast as the client reads.
+        """
+        queue = asyncio.Queue(self.depth)
+        self.clients.add(queue)
+        try:
+            while True:
+                frame = await queue.get()
+                writer.write(frame)
+                await writer.drain()
+                self.sent += 1
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.clients.discard(queue)
+            writer.close()
+
+    def publish(self, start, levels, step_size, voltage, reset=False):
+        """
+        Send block to every client (from any thread, never waits). start: sample number of levels[0],
+        reset: first block of a new run.
+        """
+        if self.clients:
+            self.loop.call_soon_threadsafe(self.enqueue, encode(start, levels, step_size, voltage, self.level_format, reset))
+
+    def enqueue(self, frame):
+        for queue in self.clients:
+            if queue.full():
+                self.dropped += 1
+            else:
+                queue.put_nowait(frame)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+async def frames(host="127.0.0.1", port=5555, path=None):
+    """
+    Async generator: (start, step_size, voltage, levels, reset) of every frame, levels as sent (float32 volts, or uint8 0 / 1),
+    reset: first frame of a new run.
+    Ends when server closes the connection.
+    """
+    reader, writer = await (asyncio.open_unix_connection(path) if path else asyncio.open_connection(host, port))
+    try:
+        while True:
+            start, count, step_size, voltage, level_format, flags = FRAME.unpack(await reader.readexactly(FRAME.size))
+            dtype = float32 if level_format == FLOAT32 else uint8
+            levels = frombuffer(await reader.readexactly(count * dtype().itemsize), dtype)
+            yield start, step_size, voltage, levels, bool(flags & RESET)
+    except asyncio.IncompleteReadError:
+        return
+    finally:
+        writer.close()
+
+
+async def listen(host, port, path, seconds):
+    """
+    Print frames, samples per second and gaps (dropped blocks) every second, and every new run.
+    """
+    count = samples = gaps = 0
+    expected, shown = None, perf_counter()
+    end = None if seconds is None else shown + seconds
+    async for start, step_size, voltage, levels, reset in frames(host, port, path):
+        if reset:
+            print(f"New run: step size {step_size} Sec, voltage {voltage} V", file=sys.stderr)
+        gaps += expected is not None and start != expected and not reset
+        expected = start + len(levels)
+        count, samples = count + 1, samples + len(levels)
+        now = perf_counter()
+        if now - shown >= 1.0:
+            print(f"{count / (now - shown):.0f} frames/Sec, {samples / (now - shown) / 1e6:.2f} M samples/Sec, gaps: {gaps}, "
+                  f"t = {expected * step_size:.6f} Sec", file=sys.stderr)
+            count = samples = 0
+            shown = now
+        if end is not None and now >= end:
+            return
+
+
+def serve(server, engine, speed, interval=0.01):
+    """
+    Publish blocks without GUI, speed = simulated seconds per wall second.
+    """
+    engine.reset()
+    debt, last, reset = 0.0, perf_counter(), True
+    while True:
+        sleep(interval)
+        now = perf_counter()
+        debt += (now - last) * speed / engine.step_size
+        last, count = now, int(debt)
+        debt -= count
+        if count:
+            start = engine.global_index_counter
+            server.publish(start, engine.next_block(count)[PULSE_ON], engine.step_size, engine.voltage, reset)
+            reset = False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream PWM samples to local clients.")
+    parser.add_argument("mode", choices=["serve", "listen"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--unix", default=None, help="Unix socket path, instead of TCP")
+    parser.add_argument("--uint8", action="store_true", help="serve: levels as uint8 (0 / 1), else float32 volts")
+    parser.add_argument("--freq", type=int, default=PWMEngine.freq, help="serve: Frequency (Hz)")
+    parser.add_argument("--duty", type=int, default=PWMEngine.duty, help="serve: Duty cycle (%%)")
+    parser.add_argument("--voltage", type=float, default=PWMEngine.voltage, help="serve: Voltage (V)")
+    parser.add_argument("--step", type=float, default=None, help="serve: Step size (Sec), default suggested for frequency")
+    parser.add_argument("--speed", type=float, default=1.0, help="serve: Simulated seconds per wall second")
+    parser.add_argument("--seconds", type=float, default=None, help="listen: Stop after seconds")
+    args = parser.parse_args(argv)
+
+    if args.mode == "listen":
+        asyncio.run(listen(args.host, args.port, args.unix, args.seconds))
+        return
+    engine = PWMEngine()
+    engine.configure(voltage=args.voltage, freq=args.freq, duty=args.duty, step_size=args.step or 1.0)
+    server = SampleServer(args.host, args.port, args.unix, UINT8 if args.uint8 else FLOAT32)
+    print(f"Serving on {server.address}", file=sys.stderr)
+    try:
+        serve(server, engine, args.speed)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
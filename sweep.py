@@ -0,0 +1,112 @@
+"""
+Parameter sweep without GUI: every combination of frequency, duty, step size and accuracy is generated with PWMEngine
+(same rules as GUI inputs, window of number_of_cycles from t = 0) in a process pool, one row of metrics per configuration:
+
+    python sweep.py --freq 10 100 1000 --duty 10 25 50 --step 1e-4 1e-6 --accuracy 0 8 --cycles 10 -o sweep.csv
+"""
+import argparse
+import csv
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from math import sqrt
+from time import perf_counter
+from numpy import abs as absolute, concatenate, flatnonzero, rint, where
+from engine import PWMEngine, X_AXIS, PULSE_ON
+
+FIELDS = (
+    "freq", "duty", "voltage", "step_size", "value_accuracy", "cycles",
+    "samples", "avg_voltage", "rms", "edges", "edge_error_mean", "edge_error_max",
+)
+
+
+def grid(freqs, duties, step_sizes, accuracies, cycles=4, voltage=PWMEngine.voltage):
+    """
+    Every combination, as arguments of PWMEngine.configure(). Accuracy 0 = suggested for frequency.
+    """
+    return [
+        {"freq": freq, "duty": duty, "step_size": step_size, "value_accuracy": accuracy, "number_of_cycles": cycles, "voltage": voltage}
+        for freq, duty, step_size, accuracy in product(freqs, duties, step_sizes, accuracies)
+    ]
+
+
+def evaluate(config, block_size=1 << 18):
+    """
+    Metrics of one configuration, samples are generated in blocks. Step size and accuracy are the values in use
+    (limited to suggested values for frequency). Edge error: |time of first sample after edge - ideal edge time| (Sec),
+    ideal edges at k / freq (rising), and k / freq + duty / 100 / freq (falling).
+    """
+    engine = PWMEngine()
+    engine.configure(**config)
+    period, width = 1 / engine.freq, engine.duty / 100 / engine.freq
+    samples = engine.window_size()
+    level_sum = square_sum = error_sum = error_max = 0.0
+    edges, last = 0, None
+    for block in engine.blocks(samples, block_size):
+        levels = block[PULSE_ON]
+        level_sum += float(levels.sum())
+        square_sum += float(levels @ levels)
+        on = levels != 0
+        changes = flatnonzero(on[1:] != on[:-1]) + 1
+        if last is not None and on[0] != last:
+            changes = concatenate(([0], changes))
+        last = on[-1]
+        if len(changes):
+            times = block[X_AXIS, changes]
+            ideal = where(on[changes], rint(times / period) * period, rint((times - width) / period) * period + width)
+            errors = absolute(times - ideal)
+            edges += len(changes)
+            error_sum += float(errors.sum())
+            error_max = max(error_max, float(errors.max()))
+    return {
+        "freq": engine.freq, "duty": engine.duty, "voltage": engine.voltage, "step_size": engine.step_size,
+        "value_accuracy": engine.value_accuracy, "cycles": engine.number_of_cycles, "samples": samples,
+        "avg_voltage": level_sum / samples, "rms": sqrt(square_sum / samples), "edges": edges,
+        "edge_error_mean": error_sum / edges if edges else 0.0, "edge_error_max": error_max,
+    }
+
+
+def sweep(configs, workers=None, chunksize=None):
+    """
+    Metrics of every configuration, in order. workers: processes (default all cores), 1 = in this process.
+    Configurations are sent in chunks (default 4 per worker), one result per configuration is sent back.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [evaluate(config) for config in configs]
+    chunksize = chunksize or max(1, len(configs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(evaluate, configs, chunksize=chunksize))
+
+
+def write_table(results, path):
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep PWM parameters, write metrics of every combination to CSV.")
+    parser.add_argument("--freq", type=int, nargs="+", default=[PWMEngine.freq], help="Frequencies (Hz)")
+    parser.add_argument("--duty", type=int, nargs="+", default=[PWMEngine.duty], help="Duty cycles (%%)")
+    parser.add_argument("--step", type=float, nargs="+", default=[1.0], help="Step sizes (Sec), default suggested for frequency")
+    parser.add_argument("--accuracy", type=int, nargs="+", default=[0], help="Accuracies (decimals), default suggested for frequency")
+    parser.add_argument("--voltage", type=float, default=PWMEngine.voltage, help="Voltage (V)")
+    parser.add_argument("--cycles", type=int, default=PWMEngine.number_of_cycles, help="Cycles generated per configuration")
+    parser.add_argument("--workers", type=int, default=None, help="Processes, default all cores")
+    parser.add_argument("-o", "--output", required=True, help="Output CSV file")
+    args = parser.parse_args(argv)
+
+    configs = grid(args.freq, args.duty, args.step, args.accuracy, args.cycles, args.voltage)
+    start = perf_counter()
+    results = sweep(configs, args.workers)
+    seconds = perf_counter() - start
+    write_table(results, args.output)
+    print(f"{len(results)} configurations written to {args.output} in {seconds:.3f} Sec, {len(results) / max(seconds, 1e-9):.1f} per Sec", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
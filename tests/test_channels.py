@@ -0,0 +1,25 @@
+import pytest
+
+from numpy import array_equal, concatenate
+from channels import ShiftedChannels
+from engine import PWMEngine, PULSE_ON
+from modulation import Modulation
+
+
+@pytest.mark.parametrize("modulation", [None, Modulation(50, 1.0)])
+def test_shifted_channels(modulation):
+    """
+    Channels of engine signal: channel 0 is the ON state of the engine, channel k is delayed by k / channels of period,
+    same edges and pulse widths (modulated too), from any sample number.
+    """
+    engine = PWMEngine(modulation=modulation)
+    engine.configure(freq=1000, duty=25, step_size=1e-6)        # 1000 samples per period.
+    on = concatenate((engine.window(), engine.next_block(5000)), axis=1)[PULSE_ON] > 0
+    channels = ShiftedChannels(engine, 4, first=0)
+    bits = channels.bits(0, len(on))
+    assert bits.shape == (4, len(on)) == (len(channels), len(on))
+    assert array_equal(bits[0], on)
+    for channel in (1, 2, 3):
+        assert array_equal(bits[channel, 250 * channel:], on[:len(on) - 250 * channel])
+    assert array_equal(channels.bits(777, 3000), bits[:, 777:3777])
+    assert len(ShiftedChannels(engine, 6, first=1)) == 5
@@ -0,0 +1,139 @@
+import subprocess
+import sys
+import pytest
+
+from numpy import allclose, array_equal, concatenate, pi, sin, tile
+from engine import PWMEngine, X_AXIS, PULSE_ON, PULSE_OFF, SINE
+from waveform import MAX_TEMPLATE, period_template
+
+
+def test_configure():
+    """
+    Same rules as GUI inputs, accuracy and step size limited to suggested values.
+    """
+    engine = PWMEngine()
+    engine.configure(freq=100, step_size="0.0001", value_accuracy="4")
+    assert engine.time_period == 0.01
+    assert engine.pulse_on_time == 0.001
+    assert engine.step_size == 1e-5
+    assert engine.value_accuracy == 5
+
+    values = engine.values()
+    with pytest.raises(ValueError):
+        engine.configure(step_size=0)
+    with pytest.raises(ValueError):
+        engine.configure(freq=1000, duty=50, voltage=3.3, step_size=0)
+    with pytest.raises(ValueError):
+        engine.configure(freq="00", duty=50)
+    with pytest.raises(ValueError):
+        engine.configure(freq=1000, duty="5.5")
+    assert engine.values() == values and engine.duty == 10    # Rejected values change nothing.
+    with pytest.raises(AttributeError):
+        PWMEngine(frequency=10)
+
+
+def test_window():
+    """
+    First window, and scrolling blocks continue the same signal.
+    """
+    engine = PWMEngine(graph_chk_off=True, graph_chk_sine=True)
+    window = engine.window()
+    assert window.shape == (4, engine.window_size()) == (4, 4000)
+    assert window[PULSE_ON].max() == 5.0
+    assert array_equal(window[PULSE_OFF], 5.0 - window[PULSE_ON])
+    assert window[SINE].min() < 0
+
+    first = engine.next_block(500)
+    second = engine.next_block(700)
+    assert engine.global_index_counter == 5200
+    x_axis = concatenate((window[X_AXIS], first[X_AXIS], second[X_AXIS]))
+    assert (x_axis[1:] > x_axis[:-1]).all()
+
+    # 10 % duty, 100 samples ON (+ edge sample) in every cycle of 1000 samples.
+    on = concatenate((window[PULSE_ON], first[PULSE_ON], second[PULSE_ON]))
+    assert set((on[:5000].reshape(5, 1000) > 0).sum(axis=1)) <= {100, 101}
+
+
+def test_blocks():
+    """
+    Generator, fixed size blocks from t = 0.
+    """
+    engine = PWMEngine()
+    blocks = list(engine.blocks(2500, block_size=1000))
+    assert [block.shape[1] for block in blocks] == [1000, 1000, 500]
+    assert blocks[0][X_AXIS][0] == 0.0
+    assert not blocks[0][PULSE_OFF].any()
+
+
+def test_no_qt():
+    """
+    Engine must work without Qt.
+    """
+    code = "import sys, engine; sys.exit('PyQt6' in sys.modules or 'pyqtgraph' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+@pytest.mark.parametrize("freq", [10, 33, 100, 1000])
+def test_relevel(freq):
+    """
+    New pulse width for samples already generated, same as a new run with new values.
+    """
+    engine = PWMEngine()
+    engine.configure(freq=freq)
+    window = engine.window()
+    x_axis = concatenate((window[X_AXIS], engine.next_block(1234)[X_AXIS]))[-window.shape[1]:]
+    engine.configure(duty=45, voltage=3.3)
+    levels = engine.relevel(x_axis)
+
+    expected = PWMEngine()
+    expected.configure(freq=freq, duty=45, voltage=3.3)
+    expected_levels = concatenate((expected.window()[PULSE_ON], expected.next_block(1234)[PULSE_ON]))[-window.shape[1]:]
+    assert array_equal(levels, expected_levels)
+    assert array_equal(engine.next_block(5000), expected.next_block(5000))
+
+
+def test_templates():
+    """
+    Periodic signal: levels are looked up in one period template, cached for same values.
+    """
+    engine = PWMEngine(graph_chk_sine=True)
+    engine.configure(freq=100, duty=25)
+    misses = period_template.cache_info().misses
+    window = engine.window()
+    block = engine.next_block(2500)
+    assert period_template.cache_info().misses <= misses + 2
+    hits = period_template.cache_info().hits
+    engine.next_block(10)
+    assert period_template.cache_info().hits == hits + 2      # ON, and Sine.
+
+    template = engine.template(PULSE_ON)
+    on = concatenate((window[PULSE_ON], block[PULSE_ON]))
+    assert array_equal(on[:6000].reshape(6, 1000), tile(template, (6, 1)))
+    assert allclose(concatenate((window[SINE], block[SINE])), 5.0 * sin(2 * pi * 100 * concatenate((window[X_AXIS], block[X_AXIS]))))
+
+    # Time period not a whole number of steps: computed from time base.
+    engine.configure(freq=33, value_accuracy=7)
+    assert engine.template(PULSE_ON) is None
+    window = engine.window()
+    assert array_equal(window[PULSE_ON], engine.time_base().pulse_on(0, window.shape[1], 5.0))
+
+    # Step finer than suggested: period longer than MAX_TEMPLATE samples, not cached.
+    engine.configure(freq=10, value_accuracy=4, step_size=1e-7)
+    assert engine.time_base().samples_per_period() > MAX_TEMPLATE
+    assert engine.template(PULSE_ON) is None and engine.template(SINE) is None
+    block = engine.next_block(3000)
+    assert array_equal(block[PULSE_ON], engine.time_base().pulse_on(engine.global_index_counter - 3000, 3000, 5.0))
+
+
+def test_long_run():
+    """
+    After days of samples, same time of pulse edges in every cycle, x axis is exact time.
+    """
+    engine = PWMEngine()
+    engine.configure(freq=100, duty=25)
+    first = engine.window()
+    engine.global_index_counter = 10 ** 11 * 1000      # Multiple of samples per period.
+    block = engine.next_block(4000)
+    assert array_equal(block[PULSE_ON], first[PULSE_ON])
+    assert block[X_AXIS][1] == 10 ** 11 * 0.01 + 1e-5
+    assert block[X_AXIS][-1] == (10 ** 14 + 3999) / 10 ** 5
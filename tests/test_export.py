@@ -0,0 +1,57 @@
+import wave
+import pytest
+
+from numpy import load, loadtxt, concatenate, array_equal
+from engine import PWMEngine, X_AXIS, PULSE_ON
+from export import CSVWriter, export, main
+
+
+def signal(total):
+    """
+    Same signal as export, from engine blocks.
+    """
+    return concatenate(list(PWMEngine().blocks(total)), axis=1)
+
+
+def test_npy(tmp_path):
+    path = str(tmp_path / "pwm.npy")
+    samples, _ = export(PWMEngine(), path, 0.25, block_size=300)
+    data = load(path, mmap_mode="r")
+    assert samples == data.shape[0] == 2500
+    assert array_equal(data.T, signal(2500)[[X_AXIS, PULSE_ON]])
+
+
+def test_csv(tmp_path):
+    path = str(tmp_path / "pwm.csv")
+    export(PWMEngine(), path, 0.01, block_size=7)
+    data = loadtxt(path, delimiter=",", skiprows=1)
+    assert data.shape == (100, 2)
+    assert array_equal(data[:, 1], signal(100)[PULSE_ON])
+
+
+def test_csv_long(tmp_path):
+    """
+    Times from 100 Sec up keep every step (not rounded to significant digits).
+    """
+    path = str(tmp_path / "pwm.csv")
+    engine = PWMEngine(global_index_counter=1_000_000)     # t = 100 Sec, step 1e-4.
+    block = engine.next_block(1000)
+    writer = CSVWriter(path, engine)
+    writer.write(block)
+    writer.close()
+    data = loadtxt(path, delimiter=",", skiprows=1)
+    assert array_equal(data[:, 0], block[X_AXIS])
+    assert len(set(data[:, 0])) == 1000
+
+
+def test_wav(tmp_path):
+    path = str(tmp_path / "pwm.wav")
+    main(["--freq", "100", "--duration", "0.5", "-o", path])
+    with wave.open(path) as file:
+        assert file.getframerate() == 100000      # 1 / 1e-5
+        assert file.getnframes() == 50000
+
+
+def test_format(tmp_path):
+    with pytest.raises(ValueError):
+        export(PWMEngine(), str(tmp_path / "pwm.txt"), 0.1)
@@ -0,0 +1,39 @@
+import json
+
+from frame_stats import FrameStats, StartupTimer
+
+
+def test_record():
+    """
+    Histogram counts, mean, percentiles and overflow bin.
+    """
+    stats = FrameStats(max_ms=10.0, bins=10)
+    start = 0.0
+    for compute in [0.0005, 0.0015, 0.0015, 0.5]:
+        stats.record(start, start + compute, start + compute + 0.001, 0.010)
+        start += 0.012
+    summary = stats.summary()
+    assert summary["compute"]["count"] == 4
+    assert stats.counts[0].tolist() == [1, 2, 0, 0, 0, 0, 0, 0, 0, 1]
+    assert summary["compute"]["p50"] == 2.0
+    assert summary["compute"]["max"] == 500.0
+    assert summary["interval"]["count"] == 3                # No interval for first tick.
+    assert round(summary["jitter"]["mean"], 6) == 2.0
+
+
+def test_dump(tmp_path):
+    stats = FrameStats()
+    stats.record(0.0, 0.001, 0.002, 0.01)
+    stats.dump(tmp_path / "frame_stats.json")
+    data = json.loads((tmp_path / "frame_stats.json").read_text())
+    assert sum(data["histograms"]["set_data"]) == 1
+    assert "Frame Stats" in stats.report()
+
+
+def test_startup_timer():
+    startup = StartupTimer()
+    startup.mark("window")
+    startup.mark("first frame")
+    assert [phase for phase, _ in startup.phases] == ["window", "first frame"]
+    assert startup.imports <= startup.phases[0][1] <= startup.phases[1][1]
+    assert "first frame" in startup.report().splitlines()[-1]
@@ -0,0 +1,49 @@
+from numpy import arange, array_equal, float32, sin
+from history import HistoryStore, segment_path
+
+
+def test_levels(tmp_path):
+    """
+    Samples on disk in any append sizes, min/max of whole blocks on every level.
+    """
+    values = sin(arange(10000) * 0.01).astype(float32)
+    history = HistoryStore(tmp_path / "history.f32", fanout=8)
+    for start in range(0, len(values), 333):
+        history.append(values[start:start + 333])
+    assert len(history) == 10000
+    assert array_equal(history.level(0), values)
+    assert history.counts[1:3] == [1250, 156]
+    assert array_equal(history.level(1)[:, 0], values.reshape(-1, 8).min(axis=1))
+    assert array_equal(history.level(2)[:, 1], values[:9984].reshape(-1, 64).max(axis=1))
+    assert history.pending[1][0].size == 0 and history.pending[2][0].size == 2
+    history.close()
+
+
+def test_envelope(tmp_path):
+    """
+    Zoomed in: samples, zoomed out: bounded number of min/max points, peaks and newest samples are kept.
+    """
+    values = (arange(100003) % 1000 < 100).astype(float32) * 5.0      # PWM, 10 % duty.
+    values[99999] = 7.0
+    history = HistoryStore(tmp_path / "history.f32", start=500, fanout=16)
+    history.append(values)
+
+    index, levels = history.envelope(1000, 1200, points=200)
+    assert array_equal(index, arange(1000, 1200))
+    assert array_equal(levels, values[1000:1200])
+
+    index, levels = history.envelope(0, len(values), points=100)
+    assert len(levels) <= 2 * 100 + 2 * 16 * 3
+    assert levels.max() == 7.0 and levels.min() == 0.0
+    assert index[0] == 0 and index[-1] >= 99999
+    assert (index[1:] >= index[:-1]).all()
+
+    index, levels = history.envelope(50000, 50000 + 64 * 100, points=100)
+    assert (levels[0::2] == 0.0).sum() > 0 and (levels[1::2] == 5.0).sum() > 0
+    assert history.envelope(200000, 300000)[0].size == 0
+    history.close()
+
+
+def test_segment_path(tmp_path):
+    assert segment_path(tmp_path / "history.f32", 0) == str(tmp_path / "history.f32")
+    assert segment_path(tmp_path / "history.f32", 2) == str(tmp_path / "history-2.f32")
@@ -0,0 +1,122 @@
+import pytest
+
+from fractions import Fraction
+from math import pi, sin
+from numpy import allclose, array, array_equal, interp
+from engine import PWMEngine, X_AXIS, PULSE_ON, SINE
+from modulation import Modulation, SAWTOOTH, TRIANGLE
+from waveform import carrier_edges, level_edges, pwm_edges
+
+
+def test_modulation():
+    """
+    Duty from sine or user reference, equal by value (template cache key).
+    """
+    modulation = Modulation(50, 0.5)
+    assert allclose(modulation.duty([0.0, 0.25, 0.5, 0.75]), [0.5, 0.75, 0.5, 0.25])
+    user = Modulation(50, 1.0, [1.0, -1.0])
+    assert array_equal(user.duty([0.0, 0.49, 0.5, 0.99]), [1.0, 1.0, 0.0, 0.0])
+    assert Modulation(50, 0.5) == modulation and hash(Modulation(50, 0.5)) == hash(modulation)
+    assert Modulation(60, 0.5) != modulation and user != Modulation(50, 1.0, [1.0, 1.0])
+    assert modulation.carrier == TRIANGLE and Modulation(50, 0.5, carrier=SAWTOOTH) != modulation
+
+    # ON while carrier <= duty: triangle 1 -> 0 -> 1 in cycle (pulse centered), sawtooth 0 -> 1 (pulse from start of cycle).
+    assert allclose(modulation.carrier_level([0.0, 0.25, 0.5, 1.0]), [1.0, 0.5, 0.0, 1.0])
+    assert array_equal(modulation.on([0.0, 0.3, 0.5, 0.7, 1.0], 0.0), [False, True, True, True, False])
+    sawtooth = Modulation(50, 0.5, carrier=SAWTOOTH)
+    assert array_equal(sawtooth.on([0.0, 0.5, 0.7], 0.25), [True, True, True]) and not sawtooth.on(0.8, 0.25)
+
+    with pytest.raises(ValueError):
+        Modulation(0)
+    with pytest.raises(ValueError):
+        Modulation(50, 1.5)
+    with pytest.raises(ValueError):
+        Modulation(50, 0.5, [2.0])
+    with pytest.raises(ValueError):
+        Modulation(50, 0.5, carrier="square")
+
+
+@pytest.mark.parametrize("carrier", [TRIANGLE, SAWTOOTH])
+def test_pulse_widths(carrier):
+    """
+    ON while carrier <= duty, checked against exact time of every sample (samples within 1e-9 of an edge skipped):
+    triangle carrier |2 * position in cycle - 1| (pulse centered), sawtooth carrier = position in cycle (pulse from start).
+    """
+    modulation = Modulation(50, 0.8, carrier=carrier)
+    engine = PWMEngine(modulation=modulation)
+    engine.configure(freq=1000, step_size=0.00001)
+    step = Fraction(repr(engine.step_size))
+    block = engine.next_block(5000)
+    for index in range(0, 5000, 7):
+        time = index * step
+        cycle = time // Fraction(1, 1000)
+        duty = (1 + 0.8 * sin(2 * pi * float(time * 50 % 1))) / 2
+        position = (time - cycle * Fraction(1, 1000)) * 1000
+        carrier_level = float(abs(2 * position - 1) if carrier == TRIANGLE else position)
+        if abs(carrier_level - duty) > 1e-9:
+            assert (block[PULSE_ON, index] == 5.0) == (carrier_level < duty), index
+
+
+def test_template():
+    """
+    Whole periods of reference and carrier = from template, same samples as computed.
+    """
+    engine = PWMEngine(graph_chk_sine=True, modulation=Modulation(50, 0.8))
+    engine.configure(freq=1000, step_size=0.00001)
+    assert engine.template(PULSE_ON) is not None and engine.template(SINE) is not None
+    engine.next_block(123)
+    block = engine.next_block(3000)
+    tb = engine.time_base()
+    assert array_equal(block[PULSE_ON], tb.modulated_pulse_on(123, 3000, 5.0, engine.modulation))
+    assert allclose(block[SINE], tb.reference_wave(123, 3000, 5.0, engine.modulation))
+
+    # 60 Hz: three reference periods, 7 Hz: 1 Sec of samples is longer than MAX_TEMPLATE, computed per block.
+    engine.modulation = Modulation(60, 0.8)
+    assert len(engine.template(PULSE_ON)) == 50000
+    assert array_equal(engine.pulse_on(49000, 3000), engine.time_base().modulated_pulse_on(49000, 3000, 5.0, engine.modulation))
+    engine.modulation = Modulation(7, 0.8)
+    assert engine.template(PULSE_ON) is None
+    assert engine.relevel(block[X_AXIS]).shape == (3000,)
+
+
+def test_edges():
+    """
+    Edges with pulse width of every cycle, or (modulation) from sample levels.
+    """
+    x, y = pwm_edges(0.0, 0.029, 0.01, [0.002, 0.005, 0.008], 5.0)
+    rising = x[1:][(y[1:] == 5.0) & (y[:-1] == 0.0) & (x[1:] > 0)]
+    falling = x[1:][(y[1:] == 0.0) & (y[:-1] == 5.0) & (x[1:] > 0)]
+    assert allclose(rising, [0.01, 0.02])
+    assert allclose(falling, [0.002, 0.015, 0.028])
+
+    x, y = level_edges(array([0.0, 1.0, 2.0, 3.0, 4.0]), array([5.0, 0.0, 0.0, 5.0, 5.0]))
+    assert array_equal(x, [0.0, 1.0, 1.0, 3.0, 3.0, 4.0]) and array_equal(y, [5.0, 5.0, 0.0, 0.0, 5.0, 5.0])
+
+    # Modulation: edges of the samples, also with carrier slower than reference (several pulses per cycle).
+    for carrier, freq in ((TRIANGLE, 1000), (SAWTOOTH, 1000), (TRIANGLE, 10)):
+        engine = PWMEngine(modulation=Modulation(50, 0.8, carrier=carrier))
+        engine.configure(freq=freq)
+        engine.next_block(123)
+        block = engine.next_block(3000)
+        x, y = engine.edges(block[X_AXIS, 0], block[X_AXIS, -1])
+        on = block[PULSE_ON]
+        assert x[0] == block[X_AXIS, 0] and x[-1] == block[X_AXIS, -1]
+        assert array_equal(x[1:-1:2], block[X_AXIS][1:][on[1:] != on[:-1]]) and array_equal(y[2:-1:2], on[1:][on[1:] != on[:-1]])
+
+
+@pytest.mark.parametrize("carrier", [TRIANGLE, SAWTOOTH])
+def test_carrier(carrier):
+    """
+    Carrier corners: samples are ON while carrier <= reference (SINE trace).
+    """
+    engine = PWMEngine(graph_chk_sine=True, modulation=Modulation(50, 0.8, carrier=carrier))
+    engine.configure(freq=1000, step_size=0.00001)
+    block = engine.next_block(20000)
+    x, y = engine.carrier(block[X_AXIS, 0], block[X_AXIS, -1])
+    assert x[0] <= block[X_AXIS, 0] and x[-1] >= block[X_AXIS, -1]
+    carrier_level = interp(block[X_AXIS], x, y) if carrier == TRIANGLE else 5.0 * (block[X_AXIS] % 0.001) / 0.001
+    on = block[PULSE_ON] == 5.0
+    assert (on != (carrier_level <= block[SINE])).mean() < 0.001         # Float rounding next to edges only.
+
+    x, y = carrier_edges(0.0015, 0.0031, 0.001, 5.0, carrier)
+    assert len(x) == len(y) == (7 if carrier == TRIANGLE else 6)
@@ -0,0 +1,52 @@
+import time
+
+from numpy import array_equal, concatenate
+from engine import PWMEngine, PULSE_ON
+from producer import BlockProducer
+
+
+def wait_ready(producer, count, timeout=5.0):
+    end = time.monotonic() + timeout
+    while producer.ready() < count and time.monotonic() < end:
+        time.sleep(0.001)
+
+
+def test_take():
+    """
+    Same samples as engine blocks, in any take() sizes, engine of caller is not changed.
+    """
+    engine = PWMEngine(graph_chk_off=True, graph_chk_sine=True)
+    engine.window()
+    producer = BlockProducer(engine, block_size=1000, depth=4)
+    try:
+        wait_ready(producer, 4000)
+        blocks = [producer.take(count) for count in (1, 999, 1500, 3)]
+        assert [block.shape[1] for block in blocks] == [1, 999, 1500, 3]
+        assert engine.global_index_counter == 4000
+
+        expected = PWMEngine(graph_chk_off=True, graph_chk_sine=True)
+        expected.window()
+        assert array_equal(concatenate(blocks, axis=1), expected.next_block(2503))
+        assert producer.take(10 ** 6).shape[1] <= 1000 - 2503 % 1000 + 4 * 1000     # Never waits: leftover, and queue (refilled).
+    finally:
+        producer.stop()
+    assert not producer.thread.is_alive()
+
+
+def test_restart():
+    """
+    New values: ready blocks are dropped, continues from sample number of engine.
+    """
+    engine = PWMEngine()
+    engine.window()
+    producer = BlockProducer(engine, block_size=500, depth=8)
+    try:
+        wait_ready(producer, 4000)
+        engine.configure(duty=50)
+        engine.global_index_counter = 4200
+        producer.restart(engine)
+        wait_ready(producer, 1000)
+        block = producer.take(1000)
+        assert array_equal(block[PULSE_ON], engine.next_block(1000)[PULSE_ON])
+    finally:
+        producer.stop()
@@ -0,0 +1,76 @@
+import pytest
+
+from numpy import arange, array, array_equal
+from ring_buffer import RingBuffer
+
+
+def test_append():
+    """
+    Oldest value is dropped, window stays in order.
+    """
+    samples = RingBuffer(4, traces=2)
+    samples.fill([[0, 1, 2, 3], [10, 11, 12, 13]])
+    for value in range(4, 11):
+        samples.append((value, value + 10))
+        assert array_equal(samples.view(0), arange(value - 3, value + 1))
+        assert array_equal(samples.view(1), arange(value + 7, value + 11))
+    assert samples.last(0) == 10
+
+
+def test_extend():
+    """
+    Block append, with wrap around and larger than window.
+    """
+    samples = RingBuffer(5)
+    samples.fill([arange(5)])
+    samples.extend([arange(5, 8)])
+    assert array_equal(samples.view(0), arange(3, 8))
+    samples.extend([arange(8, 12)])
+    assert array_equal(samples.view(0), arange(7, 12))
+    samples.extend([arange(12, 30)])
+    assert array_equal(samples.view(0), arange(25, 30))
+
+
+def test_view_zero_copy():
+    """
+    Views must share memory with buffer, and be contiguous (for setData).
+    """
+    samples = RingBuffer(3, traces=4)
+    samples.append((1, 2, 3, 4))
+    view = samples.view(2)
+    assert view.base is samples.data
+    assert view.flags["C_CONTIGUOUS"]
+
+
+def test_write():
+    """
+    Overwritten trace must stay correct after further appends.
+    """
+    samples = RingBuffer(10)
+    samples.fill([arange(10)])
+    samples.extend([arange(10, 15)])
+    samples.write(0, arange(100, 110))
+    samples.extend([arange(110, 117)])
+    assert array_equal(samples.view(0), arange(107, 117))
+
+
+def test_size():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+
+def test_resize():
+    """
+    Newest samples kept, block added at end, mirror in sync.
+    """
+    buffer = RingBuffer(5, traces=2)
+    buffer.fill([[0, 1, 2, 3, 4], [5, 6, 7, 8, 9]])
+    buffer.extend([[10, 11], [12, 13]])
+    buffer.resize(3)
+    assert buffer.view().tolist() == [[4, 10, 11], [9, 12, 13]]
+    buffer.resize(6, array([[20, 21, 22], [23, 24, 25]]))
+    assert buffer.view().tolist() == [[4, 10, 11, 20, 21, 22], [9, 12, 13, 23, 24, 25]]
+    buffer.extend([[30], [31]])
+    assert buffer.view(0).tolist() == [10, 11, 20, 21, 22, 30]
+    with pytest.raises(ValueError):
+        buffer.resize(10)
@@ -0,0 +1,86 @@
+import pytest
+
+from numpy import array_equal, concatenate, load
+from engine import PWMEngine, PULSE_ON, X_AXIS
+from modulation import Modulation, SAWTOOTH
+from session import SessionRecorder, read_session, replay, main, VALUES, PAUSE, RESUME, END
+
+
+def test_replay(tmp_path):
+    """
+    Every sample number once, with values in use when it was generated: duty change continues, frequency change starts from 0.
+    """
+    path = str(tmp_path / "session.pwms")
+    engine = PWMEngine()
+    recorder = SessionRecorder(path)
+    recorder.record(VALUES, engine, 0)
+    expected = [engine.next_block(4500)]
+    engine.configure(duty=50)
+    engine.modulation = Modulation(5, 0.5, carrier=SAWTOOTH)
+    recorder.record(VALUES, engine, engine.global_index_counter)
+    recorder.record(PAUSE, engine, engine.global_index_counter)
+    recorder.record(RESUME, engine, engine.global_index_counter)
+    expected.append(engine.next_block(3000))
+    engine.configure(freq=100)
+    recorder.record(VALUES, engine, engine.global_index_counter, 0)
+    expected.append(engine.window())
+    recorder.close(engine)
+
+    kinds = [record[0] for record in read_session(path)]
+    assert kinds == [VALUES, VALUES, PAUSE, RESUME, VALUES, END]
+    assert [record[4] for record in read_session(path)][1] == Modulation(5, 0.5, carrier=SAWTOOTH)
+    blocks = list(replay(path, block_size=1000))
+    assert max(block.shape[1] for block in blocks) == 1000
+    assert array_equal(concatenate(blocks, axis=1), concatenate(expected, axis=1))
+
+
+def test_reference(tmp_path):
+    """
+    Modulation with user reference values is not recorded (would be replayed as sine), nothing is written.
+    """
+    path = tmp_path / "session.pwms"
+    recorder = SessionRecorder(str(path))
+    with pytest.raises(ValueError):
+        recorder.record(VALUES, PWMEngine(modulation=Modulation(50, 0.8, [0.0, 1.0, 0.0, -1.0])), 0)
+    recorder.file.close()
+    assert recorder.records == 0 and list(read_session(str(path))) == []
+
+
+def test_version(tmp_path):
+    """
+    Version 1 file (modulation without carrier) is not read, or appended to.
+    """
+    path = tmp_path / "session.pwms"
+    path.write_bytes(b"PWMSES\x01\x00" + b"\x00" * 60)
+    with pytest.raises(ValueError):
+        list(read_session(str(path)))
+    with pytest.raises(ValueError):
+        SessionRecorder(str(path))
+
+
+def test_crashed(tmp_path):
+    """
+    Incomplete last record is skipped, replay up to given end.
+    """
+    path = tmp_path / "session.pwms"
+    engine = PWMEngine()
+    recorder = SessionRecorder(str(path))
+    recorder.record(VALUES, engine, 0)
+    recorder.file.close()
+    path.write_bytes(path.read_bytes() + b"\x00" * 10)
+    assert len(list(read_session(str(path)))) == 1
+    assert list(replay(str(path))) == []
+    assert array_equal(concatenate(list(replay(str(path), end=2500)), axis=1), PWMEngine().next_block(2500))
+
+
+def test_main(tmp_path, capsys):
+    path = str(tmp_path / "session.pwms")
+    engine = PWMEngine()
+    recorder = SessionRecorder(path)
+    recorder.record(VALUES, engine, 0)
+    engine.next_block(1234)
+    recorder.close(engine)
+    main([path, "-o", str(tmp_path / "replay.npy")])
+    assert array_equal(load(tmp_path / "replay.npy").T, PWMEngine().next_block(1234)[[X_AXIS, PULSE_ON]])
+    main([path, "--list"])
+    assert capsys.readouterr().out.splitlines()[1].startswith("end")
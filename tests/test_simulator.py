@@ -1,8 +1,14 @@
+import json
 import pytest
 import simulator
 import logging
+import time
 
+from numpy import array_equal, concatenate, uint8
 from PyQt6 import QtCore
+from engine import PWMEngine
+from modulation import Modulation
+from session import replay
 
 
 @pytest.fixture
@@ -12,11 +18,27 @@ def app(qtbot):
     """
     test_app = simulator.MainWindow(logger=log())
     qtbot.addWidget(test_app)
+    test_app.update_delay = 0   # Parameter changes applied at once, not coalesced (see test_coalesced_updates).
 
     load_values(test_app)   # Changes variable values, not inputs of GUI.
     return test_app
 
 
+def shown(curve):
+    """
+    Levels of graph as drawn (after its transform: voltage, offset, mirrored OFF state).
+    """
+    transform = curve.transform()
+    return curve.yData * transform.m22() + transform.dy()
+
+
+def on_state(window):
+    """
+    ON state of window in volts, levels are stored as 0 / 1 (voltage is the graph transform).
+    """
+    return window.levels.view(0) * window.voltage
+
+
 def log():
     logger = logging.getLogger(__name__)
     logger.setLevel(logging.NOTSET)     # Disabel logging, else test will print to console.
@@ -53,6 +75,19 @@ def test_inputs(app):
     assert app.pulse_on_time == 0.01
 
 
+def test_first_window(qtbot):
+    """
+    Window filled by __init__, same samples as the engine's first window, and the loaded values applied on top of it.
+    """
+    window = simulator.MainWindow(logger=log())
+    qtbot.addWidget(window)
+    assert window.filled
+    assert array_equal(on_state(window), PWMEngine().window()[simulator.PULSE_ON])
+
+    load_values(window)
+    assert array_equal(on_state(window), PWMEngine(voltage=10.0).window()[simulator.PULSE_ON])
+
+
 def test_button(app, qtbot):
     """
     Test Buttons.
@@ -79,6 +114,20 @@ def test_button(app, qtbot):
     assert app.intervel == 350
 
 
+def test_rejected_input(app, qtbot):
+    """
+    Rejected input shows a warning, values are unchanged and the plot keeps scrolling.
+    """
+    values = app.engine.values()
+    app.freq_edit.setText("00")
+    app.duty_edit.setText("50")
+    qtbot.mouseClick(app.button, QtCore.Qt.MouseButton.LeftButton)
+
+    assert app.warning.text() == "Only Float/Integer allowed"
+    assert app.engine.values() == values
+    app.update_plot()
+
+
 def test_monitor(app, qtbot):
     """
     Monitor Output.
@@ -94,16 +143,467 @@ def test_monitor(app, qtbot):
         Pulse width:    {app.pulse_on_time} Sec
         Step Size:      {app.step_size}
         No. Cycles:     {app.number_of_cycles}
-        Accuracy Value: {app.value_accuracy} Decimals"""
+        Accuracy Value: {app.value_accuracy} Decimals
+        Templates:      """
 
     qtbot.mouseClick(app.button, QtCore.Qt.MouseButton.LeftButton)
-    assert app.monitor_textbox.toPlainText() == monitor_output
+    assert app.monitor_textbox.toPlainText().startswith(monitor_output)
+    templates = simulator.period_template.cache_info()
+    assert app.monitor_textbox.toPlainText().endswith(f"{templates.hits} hits / {templates.misses} misses")
+
+
+def test_samples_per_frame(app):
+    """
+    Block of samples per tick, and speed mode.
+    """
+    app.frame_edit.setCurrentText("100")
+    index = app.global_index_counter
+    app.update_plot()
+    assert app.global_index_counter == index + 100
+    assert app.samples.last(simulator.X_AXIS) == pytest.approx(app.end_x_axis - app.step_size, abs=app.step_size)
+
+    app.frame_edit.setCurrentText("x10")
+    assert app.speed == 10.0
+    assert abs(app.frame_samples(app.last_tick + 0.01) - 1000) <= 1     # 0.01 Sec * 10 / 0.0001
+    assert app.frame_samples(app.last_tick + 10) == len(app.samples)    # Never more than one window.
+
+    app.frame_edit.setCurrentText("x0")
+    assert app.warning.text() == "Samples/Frame: 1, 2.. or x0.5, x2.."
+    assert app.speed == 10.0
+
+
+def test_traces(app, qtbot):
+    """
+    Hidden OFF, and Sine graphs are not created or computed, filled when shown. OFF state is not stored, drawn from ON state.
+    """
+    assert app.line_graph_off is None
+    assert app.sine_wave is None
+    app.update_plot()
+    assert app.samples.view().shape == (2, len(app.samples))       # X axis, Sine wave.
+    assert app.levels.view().shape == (1, len(app.samples)) and app.levels.data.dtype == uint8     # ON state, 0 / 1.
+
+    app.chk_button.setChecked(True)
+    app.edge_button.setChecked(False)
+    assert app.line_graph_off.isVisible()
+    on = on_state(app)
+    assert array_equal(shown(app.line_graph_off), app.voltage - on)
+    app.edge_button.setChecked(True)
+
+    app.chk_button_sine.setChecked(True)
+    assert app.sine_wave.isVisible()
+    assert app.samples.view(simulator.SINE).min() < 0
+    assert app.plt.viewRange()[1][0] < 0
+
+    app.chk_button.setChecked(False)
+    assert not app.line_graph_off.isVisible()
+
+    # ON state from pulse edges (4 points per cycle), or from every sample.
+    assert len(app.line_graph.getData()[0]) <= 4 * (app.number_of_cycles + 1) + 2
+    app.edge_button.setChecked(False)
+    assert len(app.line_graph.xData) == len(app.samples)
+
+
+def test_incremental_update(app, qtbot):
+    """
+    Changed values recompute only what they need, scroll position is kept.
+    """
+    app.timer.stop()
+    app.chk_button.setChecked(True)
+    app.edge_button.setChecked(False)      # OFF state graph from samples.
+    app.frame_edit.setCurrentText("100")
+    for _ in range(5):
+        app.update_plot()
+    x_axis = app.samples.view(simulator.X_AXIS).copy()
+
+    app.duty_edit.setText("50")
+    app.voltage_edit.setText("3.3")
+    qtbot.mouseClick(app.button, QtCore.Qt.MouseButton.LeftButton)
+    assert array_equal(app.samples.view(simulator.X_AXIS), x_axis)
+    engine = PWMEngine()
+    engine.configure(duty=50, voltage=3.3)
+    expected = concatenate((engine.window(), engine.next_block(app.global_index_counter - len(x_axis))), axis=1)[:, -len(x_axis):]
+    assert array_equal(on_state(app), expected[simulator.PULSE_ON])
+    assert array_equal(shown(app.line_graph_off), 3.3 - expected[simulator.PULSE_ON])
+
+    # More cycles: next samples added, less cycles: oldest dropped.
+    app.dial_freq.setValue(8)
+    assert len(app.samples) == 8000
+    assert app.samples.view(simulator.X_AXIS)[0] == x_axis[0]
+    app.update_plot()
+    expected = concatenate((expected, engine.next_block(4100)), axis=1)
+    assert array_equal(on_state(app), expected[simulator.PULSE_ON, -8000:])
+    app.dial_freq.setValue(2)
+    assert len(app.samples) == 2000
+    assert array_equal(on_state(app), expected[simulator.PULSE_ON, -2000:])
+    assert app.start_x_axis == expected[simulator.X_AXIS, -2000]
+
+    # New frequency: new plot from t = 0.
+    app.freq_edit.setText("100")
+    qtbot.mouseClick(app.button, QtCore.Qt.MouseButton.LeftButton)
+    assert app.samples.view(simulator.X_AXIS)[0] == 0.0
+
+
+def test_negative_voltage(app, qtbot):
+    """
+    Pulses are kept through negative voltage: 10 -> -5 -> 3 V, same levels as a new run.
+    """
+    app.edge_button.setChecked(False)      # Graphs from samples.
+    levels = app.levels.view(0).copy()
+    for voltage in (-5.0, 3.0):
+        app.voltage_edit.setText(f"{voltage}")
+        qtbot.mouseClick(app.button, QtCore.Qt.MouseButton.LeftButton)
+        on = PWMEngine(voltage=voltage).window()[simulator.PULSE_ON]
+        assert array_equal(shown(app.line_graph), on)
+        assert set(on) == {0.0, voltage}
+        assert array_equal(app.levels.view(0), levels)     # 0 / 1 levels kept, voltage is the graph transform.
+
+
+def test_modulation(app):
+    """
+    Modulation input: pulse widths and reference recomputed for window, scroll position is kept, Off = fixed duty.
+    """
+    app.chk_button_sine.setChecked(True)
+    x_axis = app.samples.view(simulator.X_AXIS).copy()
+    app.modulation_edit.setCurrentText("50, 1.0")
+    assert app.engine.modulation == Modulation(50, 1.0)
+    assert app.chk_button_sine.text() == "Show Reference"
+    assert array_equal(app.samples.view(simulator.X_AXIS), x_axis)
+    engine = PWMEngine(voltage=app.voltage, graph_chk_sine=True, modulation=Modulation(50, 1.0))
+    assert array_equal(on_state(app), engine.window()[simulator.PULSE_ON])
+    edges = app.engine.edges(x_axis[0], x_axis[-1], 1.0)     # Edge plot from shown levels, same as engine.
+    assert all(array_equal(data, expected) for data, expected in zip(app.line_graph.getData(), edges))
+    x, y = app.carrier_curve.getData()                  # Carrier drawn with reference, corner points of window.
+    assert app.carrier_curve.isVisible() and len(x) < len(app.samples) // 10
+    assert x[0] <= app.samples.view(simulator.X_AXIS)[0] and set(y) <= {0.0, app.voltage} | set(y[[0, -1]])
+
+    app.modulation_edit.setCurrentText("50, 0.8, sawtooth")
+    assert app.engine.modulation == Modulation(50, 0.8, carrier="sawtooth")
+    app.modulation_edit.setCurrentText("50, 2")
+    assert app.warning.text().startswith("Modulation")
+    assert app.engine.modulation == Modulation(50, 0.8, carrier="sawtooth")
+    app.modulation_edit.setCurrentText("Off")
+    assert app.engine.modulation is None
+    assert not app.carrier_curve.isVisible()
+    assert array_equal(on_state(app), PWMEngine(voltage=app.voltage).window()[simulator.PULSE_ON])
+
+
+def test_downsampling(app, qtbot):
+    """
+    Graphs from samples are peak downsampled (Auto from plot width), edge plot never.
+    """
+    app.chk_button_sine.setChecked(True)
+    app.edge_button.setChecked(False)
+    app.downsample_edit.setCurrentText("Off")
+    assert app.downsample == 1
+    assert len(app.line_graph.getData()[0]) == len(app.samples)
+
+    app.downsample_edit.setCurrentText("8")
+    assert len(app.line_graph.getData()[0]) < len(app.samples) // 2
+    assert app.line_graph.getData()[1].max() == 1     # Peaks (pulses) are kept.
+    assert len(app.sine_wave.getData()[0]) < len(app.samples) // 2
+
+    app.downsample_edit.setCurrentText("Auto")
+    assert app.downsample == 0
+    app.timer.stop()
+    app.dial_freq.setValue(100)
+    assert len(app.line_graph.getData()[0]) < len(app.samples) // 2
+
+    # Zoomed in: factor from visible range, every sample of it is drawn (edges kept).
+    x_axis, levels = app.samples.view(simulator.X_AXIS), app.levels.view(0)
+    app.plt.setXRange(x_axis[1000], x_axis[1200], padding=0)
+    x_drawn, y_drawn = app.line_graph.getData()
+    first = int(round((x_drawn[0] - x_axis[0]) / app.step_size))
+    assert 201 <= len(x_drawn) <= 203
+    assert array_equal(y_drawn, levels[first:first + len(y_drawn)])
+    assert set(y_drawn) == {0, 1}
+
+    app.edge_button.setChecked(True)
+    assert len(app.line_graph.getData()[0]) <= 4 * (app.number_of_cycles + 1) + 2
+
+
+def test_channels(app, qtbot):
+    """
+    Extra phase shifted channels, stacked above ON state, generated every tick.
+    """
+    assert app.channel_graphs == ()
+    app.channels_edit.setCurrentText("6")
+    assert len(app.channel_graphs) == 5
+    assert app.channel_samples.view().shape == (5, len(app.samples))
+
+    app.update_plot()
+    levels = app.channel_samples.view()
+    assert levels.shape == (5, len(app.samples))
+    assert levels.dtype == uint8 and set(levels[0]) == {0, 1}            # Voltage applied only when drawn.
+    assert len(app.channel_graphs[4].xData) == len(app.samples)
+    assert set(shown(app.channel_graphs[0])) == {app.voltage + 1, 2 * app.voltage + 1}     # Channel 2, offset voltage + 1.
+    assert app.plt.viewRange()[1][1] >= 6 * app.voltage
+
+    app.channels_edit.setCurrentText("0")
+    assert app.warning.text() == "Channels: 1 - 64"
+    app.channels_edit.setCurrentText("1")
+    assert app.channel_graphs == ()
+    assert app.bank is None
+
+
+def test_background(app, qtbot):
+    """
+    Samples generated ahead by background producer, same signal, restarted on new values.
+    """
+    app.timer.stop()
+    first = app.global_index_counter
+    app.background_button.setChecked(True)
+    assert app.producer is not None
+    app.frame_edit.setCurrentText("100")
+    qtbot.waitUntil(lambda: app.producer.ready() >= 1000)
+    for _ in range(10):
+        app.update_plot()
+    assert app.global_index_counter == first + 1000
+    engine = PWMEngine(voltage=app.voltage)
+    assert array_equal(on_state(app)[-1000:], engine.pulse_on(first, 1000))
+    engine.global_index_counter = app.global_index_counter
+
+    app.duty_edit.setText("50")
+    qtbot.mouseClick(app.button, QtCore.Qt.MouseButton.LeftButton)
+    qtbot.waitUntil(lambda: app.producer.ready() >= 100)
+    app.update_plot()
+    engine.configure(duty=50, voltage=app.voltage)     # Voltage of the input field.
+    assert array_equal(on_state(app)[-100:], engine.next_block(100)[simulator.PULSE_ON])
+
+    app.background_button.setChecked(False)
+    assert app.producer is None
+
+
+def test_frame_stats(app, qtbot, tmp_path):
+    """
+    Frame stats shown in Monitor, and written on close.
+    """
+    assert app.frame_stats is None
+    app.stats_button.setChecked(True)
+    app.update_plot()
+    app.update_plot()
+    assert app.frame_stats.summary()["compute"]["count"] == 2
+    assert "Frame Stats" in app.monitor_textbox.toPlainText()
+
+    app.frame_stats_file = tmp_path / "frame_stats.json"
+    app.close()
+    assert (tmp_path / "frame_stats.json").exists()
+
+    app.stats_button.setChecked(False)
+    assert app.frame_stats is None
+
+
+def test_frame_stats_spectrum(app, monkeypatch):
+    """
+    Spectrum refresh is not counted as set_data time.
+    """
+    app.spectrum_button.setChecked(True)
+    app.stats_button.setChecked(True)
+    monkeypatch.setattr(app, "refresh_spectrum", lambda now: time.sleep(0.05))
+    app.spectrum_shown = 0.0
+    app.update_plot()
+    assert app.frame_stats.summary()["set_data"]["max"] < 50
+
+
+def test_coalesced_updates(app, qtbot):
+    """
+    Burst of dial detents and check buttons: first change at once, rest applied together with latest values.
+    """
+    app.update_delay = 1000
+    app.last_update = 0.0
+    rebuilds = app.rebuilds
+    for cycles in range(5, 40):
+        app.dial_freq.setValue(cycles)
+    app.chk_button.setChecked(True)
+    assert app.rebuilds == rebuilds + 1         # Only the first detent.
+    assert app.number_of_cycles == 5
+    assert app.label_frequency.text() == "Cycles: 39"
+    assert app.line_graph_off is None
+
+    qtbot.waitUntil(lambda: app.rebuilds == rebuilds + 2, timeout=3000)
+    assert app.number_of_cycles == 39
+    assert len(app.samples) == app.engine.window_size()
+    assert app.line_graph_off.isVisible()
+    assert not app.pending_updates
+
+
+def test_deferred(qtbot):
+    """
+    Deferred window: shown first, samples generated after first frame, startup phases reported.
+    """
+    startup = simulator.StartupTimer()
+    window = simulator.MainWindow(logger=log(), deferred=True, startup=startup)
+    qtbot.addWidget(window)
+    assert not window.filled
+    assert not window.timer.isActive()
+    assert not window.samples.view(simulator.X_AXIS).any()
+
+    window.show()
+    qtbot.waitUntil(lambda: window.startup is None)
+    assert window.filled and window.timer.isActive()
+    assert [phase for phase, _ in startup.phases] == ["window", "first frame", "first data", "data frame"]
+    window.timer.stop()
+    engine = PWMEngine()
+    expected = concatenate((engine.window(), engine.next_block(window.global_index_counter - len(window.samples))), axis=1)
+    assert array_equal(on_state(window), expected[simulator.PULSE_ON, -len(window.samples):])
+
+
+def test_setup_logging(tmp_path):
+    """
+    Log records are written by listener thread.
+    """
+    logger, listener = simulator.setup_logging(filename=tmp_path / "simulator.log", level=logging.DEBUG)
+    logger.debug("Dial: Time Delay Rotated Value: %s", 350)
+    listener.stop()
+    for handle in logger.handlers[:]:
+        logger.removeHandler(handle)
+    assert "Dial: Time Delay Rotated Value: 350" in (tmp_path / "simulator.log").read_text()
+
+
+def test_record(app, qtbot, tmp_path):
+    """
+    Recorded session replays to the shown samples.
+    """
+    app.timer.stop()
+    app.session_file = str(tmp_path / "session.pwms")
+    app.frame_edit.setCurrentText("100")
+    app.record_button.setChecked(True)
+    for _ in range(5):
+        app.update_plot()
+    app.duty_edit.setText("50")
+    qtbot.mouseClick(app.button, QtCore.Qt.MouseButton.LeftButton)
+    app.dial_freq.setValue(6)
+    qtbot.mouseClick(app.pause_button, QtCore.Qt.MouseButton.LeftButton)
+    qtbot.mouseClick(app.pause_button, QtCore.Qt.MouseButton.LeftButton)
+    for _ in range(30):
+        app.update_plot()
+    shown = on_state(app)[-3000:].copy()
+    app.record_button.setChecked(False)
+    assert app.session is None
+    assert array_equal(concatenate(list(replay(app.session_file)), axis=1)[simulator.PULSE_ON, -3000:], shown)
+
+    older = tmp_path / "older.pwms"                     # Session file of version 1 is not appended to.
+    older.write_bytes(b"PWMSES\x01\x00")
+    app.session_file, session_file = str(older), app.session_file
+    app.record_button.setChecked(True)
+    assert app.session is None and not app.record_button.isChecked() and app.warning.text().startswith("Record")
+    app.session_file = session_file
+
+    app.record_button.setChecked(True)
+    app.freq_edit.setText("100")
+    qtbot.mouseClick(app.button, QtCore.Qt.MouseButton.LeftButton)
+    for _ in range(3):
+        app.update_plot()
+    app.close()
+    last = concatenate(list(replay(app.session_file)), axis=1)[:, -len(app.samples):]
+    assert array_equal(last[simulator.X_AXIS], app.samples.view(simulator.X_AXIS))
+    assert array_equal(last[simulator.PULSE_ON], on_state(app))
+
+
+def test_spectrum(app):
+    """
+    Spectrum pane refreshed on new values, and at spectrum_rate while scrolling.
+    """
+    app.timer.stop()
+    assert app.spectrum_plot is None
+    app.spectrum_button.setChecked(True)
+    assert not app.spectrum_plot.isHidden()
+    frequencies, amplitudes = app.spectrum_curve.getData()
+    assert frequencies[0] == 0.0 and abs(amplitudes[0] - app.voltage * 0.1) < 0.05
+    assert "THD" in app.spectrum_plot.plotItem.titleLabel.text
+
+    app.spectrum_shown = 0.0
+    app.update_plot()
+    assert app.spectrum_shown > 0.0
+    shown = app.spectrum_shown
+    app.update_plot()
+    assert app.spectrum_shown == shown      # Not every tick.
+
+    app.spectrum_button.setChecked(False)
+    assert app.spectrum_plot.isHidden()
+
+
+def test_history(app, qtbot, tmp_path):
+    """
+    Whole run kept on disk, paused plot zoomed out over it and back to single samples.
+    """
+    app.timer.stop()
+    app.history_file = str(tmp_path / "history.f32")
+    app.frame_edit.setCurrentText("1000")
+    app.history_button.setChecked(True)
+    start = app.history.start       # Oldest sample of window.
+    for _ in range(50):
+        app.update_plot()
+    assert len(app.history) == app.global_index_counter - start == len(app.samples) + 50000
+    assert array_equal(app.history.level(0)[-len(app.samples):], on_state(app))
+
+    qtbot.mouseClick(app.pause_button, QtCore.Qt.MouseButton.LeftButton)
+    assert app.history_curve.isVisible() and not app.line_graph.isVisible()
+    app.plt.setXRange(0.0, 5.4, padding=0)
+    x_axis, levels = app.history_curve.getData()
+    assert len(x_axis) <= 4 * max(app.plt.width(), 100)
+    assert x_axis[0] == pytest.approx(start * app.step_size) and levels.max() == app.voltage and levels.min() == 0.0
+    app.plt.setXRange(1.0, 1.01, padding=0)
+    x_axis, levels = app.history_curve.getData()
+    first = round(x_axis[0] / app.step_size)
+    assert 100 <= len(x_axis) <= 103 and 9999 <= first <= 10000
+    assert array_equal(levels, PWMEngine(voltage=app.voltage).next_block(10200)[simulator.PULSE_ON, first:first + len(levels)].astype("float32"))
+
+    qtbot.mouseClick(app.pause_button, QtCore.Qt.MouseButton.LeftButton)
+    assert not app.history_curve.isVisible() and app.line_graph.isVisible()
+
+    # New frequency (new time axis from t = 0): next segment file, earlier run is kept.
+    app.freq_edit.setText("100")
+    qtbot.mouseClick(app.button, QtCore.Qt.MouseButton.LeftButton)
+    assert app.history.path == str(tmp_path / "history-1.f32") and len(app.history) == len(app.samples)
+    assert (tmp_path / "history.f32").stat().st_size == (4000 + 50000) * 4
+    segments = json.loads((tmp_path / "history.f32.json").read_text())
+    assert segments == [
+        {"file": str(tmp_path / "history.f32"), "start": start, "step_size": 1e-4},
+        {"file": str(tmp_path / "history-1.f32"), "start": 0, "step_size": app.step_size},
+    ]
+    app.history_button.setChecked(False)
+    assert app.history is None
+
+
+def test_stream(app):
+    """
+    Every new block is published to clients, with sample number of first sample.
+    """
+    app.timer.stop()
+    app.stream_port = 0     # Any free port.
+    app.frame_edit.setCurrentText("100")
+    app.stream_button.setChecked(True)
+    assert app.stream is not None
+    published = []
+    app.stream.publish = lambda start, levels, step_size, voltage, reset=False: published.append((start, levels.copy(), reset))
+    first = app.global_index_counter
+    for _ in range(3):
+        app.update_plot()
+    assert [start - first for start, _, _ in published] == [0, 100, 200]
+    assert array_equal(published[-1][1], on_state(app)[-100:])
+
+    # More cycles: added samples are published too, no gap.
+    app.dial_freq.setValue(8)
+    app.update_plot()
+    assert [(start - first, len(levels)) for start, levels, _ in published[3:]] == [(300, 4000), (4300, 100)]
+    assert array_equal(published[3][1], on_state(app)[-4100:-100])
+
+    # New frequency: new window from t = 0, sent as a new run.
+    published.clear()
+    app.freq_edit.setText("100")
+    app.button_update()
+    assert [(start, len(levels), reset) for start, levels, reset in published] == [(0, len(app.samples), True)]
+    assert array_equal(published[0][1], on_state(app))
+
+    app.stream_button.setChecked(False)
+    assert app.stream is None
 
 
 def load_values(test_app):
     """
-    Class variables.
+    Class variables, samples follow them through the same path as the Update button (apply_changes()).
     """
+    old_values = test_app.engine.values()
     test_app.freq = 10
     test_app.value_accuracy = 2 + len(f"{test_app.freq}") if test_app.freq % 2 == 0 else 1 + len(f"{test_app.freq}")
     test_app.time_period = round(1/test_app.freq, test_app.value_accuracy)
@@ -117,3 +617,4 @@ def load_values(test_app):
     test_app.start_x_axis = 0.0
     test_app.end_x_axis = round((1/test_app.freq) * test_app.number_of_cycles, test_app.value_accuracy)
     test_app.pulse_end, test_app.pulse_start = test_app.pulse_on_time, 0.0
+    test_app.apply_changes(old_values)
@@ -0,0 +1,32 @@
+from numpy import allclose, arange, pi, sin
+from engine import PWMEngine, PULSE_ON
+from spectrum import harmonic_amplitudes, pwm_harmonics, spectrum, thd
+
+
+def test_sine():
+    """
+    Amplitude of sine, whole periods (no leakage) and Hann window.
+    """
+    levels = 2.0 + 3.0 * sin(2 * pi * 50 * arange(1050) * 1e-4)     # 5.25 periods.
+    frequencies, amplitudes = spectrum(levels, 1e-4, period_samples=200)
+    assert len(frequencies) == 501 and frequencies[5] == 50.0
+    assert allclose(amplitudes[[0, 5]], [2.0, 3.0])
+    assert thd(harmonic_amplitudes(frequencies, amplitudes, 50)) < 1e-12
+
+    frequencies, amplitudes = spectrum(levels, 1e-4)
+    assert abs(harmonic_amplitudes(frequencies, amplitudes, 50, 1)[0] - 3.0) < 0.2      # Hann: scalloping between bins.
+
+
+def test_pwm():
+    """
+    Spectrum of samples close to ideal PWM harmonics.
+    """
+    engine = PWMEngine()
+    engine.configure(freq=1000, duty=25)
+    levels = engine.window()[PULSE_ON]
+    frequencies, amplitudes = spectrum(levels, engine.step_size, engine.time_base().samples_per_period())
+    measured = harmonic_amplitudes(frequencies, amplitudes, 1000)
+    ideal = pwm_harmonics(5.0, 0.25)
+    assert allclose(measured[:10], ideal[:10], atol=0.02)
+    assert abs(thd(measured) - thd(ideal)) < 0.01
+    assert allclose(pwm_harmonics(1.0, 0.5, 4), [2 / pi, 0.0, 2 / (3 * pi), 0.0])
@@ -0,0 +1,104 @@
+import asyncio
+import socket
+import time
+import pytest
+
+from threading import Thread
+from numpy import array_equal, concatenate
+from engine import PWMEngine, PULSE_ON
+from stream import FRAME, RESET, UINT8, SampleServer, encode, frames
+
+
+def publish_when_connected(server, blocks, clients=1):
+    def run():
+        end = time.monotonic() + 5.0
+        while len(server.clients) < clients and time.monotonic() < end:
+            time.sleep(0.001)
+        for start, levels in blocks:
+            server.publish(start, levels, 0.0001, 5.0)
+    thread = Thread(target=run)
+    thread.start()
+    return thread
+
+
+async def receive(count, **address):
+    received = []
+    async for frame in frames(**address):
+        received.append(frame)
+        if len(received) == count:
+            break
+    return received
+
+
+def engine_blocks(count, size):
+    engine = PWMEngine()
+    return [(engine.global_index_counter, engine.next_block(size)[PULSE_ON]) for _ in range(count)]
+
+
+def test_encode():
+    levels = PWMEngine().window()[PULSE_ON][:1000]
+    frame = encode(42, levels, 0.0001, 5.0, UINT8)
+    assert len(frame) == FRAME.size + 1000
+    assert FRAME.unpack(frame[:FRAME.size]) == (42, 1000, 0.0001, 5.0, UINT8, 0)
+    assert set(frame[FRAME.size:]) == {0, 1}
+    assert encode(42, -levels, 0.0001, -5.0, UINT8) == encode(42, levels, 0.0001, -5.0, UINT8)    # Negative voltage, same bits.
+    assert FRAME.unpack(encode(0, levels, 0.0001, 5.0, reset=True)[:FRAME.size])[-1] == RESET
+
+
+def test_tcp():
+    """
+    Every block in order, sample numbers and levels as published, several clients.
+    """
+    server = SampleServer(port=0, depth=64)      # All blocks queued, none dropped.
+    try:
+        blocks = engine_blocks(50, 1000)
+        thread = publish_when_connected(server, blocks, clients=2)
+
+        async def two_clients():
+            return await asyncio.gather(*(receive(50, port=server.address[1]) for _ in range(2)))
+        for received in asyncio.run(two_clients()):
+            thread.join()
+            assert [start for start, _, _, _, _ in received] == [start for start, _ in blocks]
+            assert array_equal(concatenate([levels for _, _, _, levels, _ in received]), concatenate([levels for _, levels in blocks]))
+            assert received[0][1:3] == (0.0001, 5.0)
+    finally:
+        server.stop()
+    assert not server.thread.is_alive()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets only")
+def test_unix(tmp_path):
+    path = str(tmp_path / "pwm.sock")
+    server = SampleServer(path=path, level_format=UINT8)
+    try:
+        blocks = engine_blocks(10, 500)
+        thread = publish_when_connected(server, blocks)
+        received = asyncio.run(receive(10, path=path))
+        thread.join()
+        assert array_equal(concatenate([levels for _, _, _, levels, _ in received]), concatenate([levels for _, levels in blocks]) > 0)
+    finally:
+        server.stop()
+
+
+def test_slow_client():
+    """
+    Client which never reads: blocks are dropped for it, publish() does not wait.
+    """
+    server = SampleServer(port=0, depth=4)
+    client = socket.create_connection(server.address)
+    try:
+        end = time.monotonic() + 5.0
+        while not server.clients and time.monotonic() < end:
+            time.sleep(0.001)
+        levels = PWMEngine().next_block(1 << 16)[PULSE_ON]
+        start = time.perf_counter()
+        for index in range(200):
+            server.publish(index << 16, levels, 0.0001, 5.0)
+        assert time.perf_counter() - start < 2.0
+        while server.dropped <= 100 and time.monotonic() < end:
+            time.sleep(0.01)
+        assert server.dropped > 100
+        assert server.sent < 100                # Socket buffers are full.
+    finally:
+        client.close()
+        server.stop()
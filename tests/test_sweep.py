@@ -0,0 +1,41 @@
+import csv
+
+from math import sqrt
+from sweep import evaluate, grid, main, sweep
+
+
+def test_evaluate():
+    """
+    Average, RMS of 10 % duty, every edge within one step of ideal, values in use are reported.
+    """
+    result = evaluate({"freq": 10, "duty": 10, "voltage": 5.0, "step_size": 1.0, "number_of_cycles": 4}, block_size=999)
+    assert result["step_size"] == 0.0001 and result["value_accuracy"] == 4
+    assert result["samples"] == 4000
+    assert abs(result["avg_voltage"] - 0.5) < 0.006                      # Sample at end of pulse is ON, one per cycle.
+    assert abs(result["rms"] - 5.0 * sqrt(0.1)) < 0.02
+    assert result["edges"] == 7                                         # ON from t = 0, falling and rising edges.
+    assert result["edge_error_max"] <= result["step_size"] * 1.000001
+
+    negative = evaluate({"freq": 10, "duty": 10, "voltage": -5.0, "step_size": 1.0, "number_of_cycles": 4}, block_size=999)
+    assert negative["edges"] == 7 and negative["edge_error_max"] == result["edge_error_max"]
+    assert negative["avg_voltage"] == -result["avg_voltage"] and negative["rms"] == result["rms"]
+
+    rounded = evaluate({"freq": 7, "duty": 33, "value_accuracy": 2, "number_of_cycles": 10})
+    assert rounded["edge_error_max"] > 0.01                             # Time period rounded to 0.14 Sec.
+
+
+def test_sweep(tmp_path):
+    """
+    Same results in pool and in process, in order of grid, one CSV row per configuration.
+    """
+    configs = grid([10, 100], [10, 50], [1.0, 1e-5], [0], cycles=3)
+    assert len(configs) == 8
+    results = sweep(configs, workers=2, chunksize=3)
+    assert results == sweep(configs, workers=1)
+    assert [(result["freq"], result["duty"]) for result in results[:4]] == [(10, 10), (10, 10), (10, 50), (10, 50)]
+
+    main(["--freq", "10", "100", "--duty", "25", "--cycles", "2", "--workers", "1", "-o", str(tmp_path / "sweep.csv")])
+    with open(tmp_path / "sweep.csv") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["freq"] for row in rows] == ["10", "100"]
+    assert float(rows[1]["avg_voltage"]) > 1.2
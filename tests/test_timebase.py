@@ -0,0 +1,44 @@
+from fractions import Fraction
+from numpy import array_equal
+from timebase import TimeBase, exact
+
+
+def reference(start_index, count, step, period, on):
+    """
+    Sample by sample with fractions.
+    """
+    levels = []
+    for index in range(start_index, start_index + count):
+        levels.append(5.0 if index * step % period <= on else 0.0)
+    return levels
+
+
+def test_exact():
+    assert exact(0.1) == Fraction(1, 10)
+    assert exact(1e-05) == Fraction(1, 100000)
+    assert exact(0.0303030) == Fraction(30303, 1000000)
+
+
+def test_time_base():
+    """
+    Time in integer units, pulse edges land exactly, also when period is not a whole number of steps.
+    """
+    base = TimeBase(1e-4, 0.0303030, 0.0030303, 33)
+    step, period, on = exact(1e-4), exact(0.0303030), exact(0.0030303)
+    assert base.samples_per_period() is None
+    assert base.window_size(4) == 1213          # 4 * 303.03 samples, rounded up.
+    assert base.pulse_on(0, 3000, 5.0).tolist() == reference(0, 3000, step, period, on)
+    assert base.pulse_on(10 ** 12, 3000, 5.0).tolist() == reference(10 ** 12, 3000, step, period, on)
+    assert base.time(10 ** 12, 3).tolist() == [1e8, 1e8 + 1e-4, 1e8 + 2e-4]
+
+    base = TimeBase(1e-5, 0.01, 0.001, 100)
+    assert (base.unit, base.step, base.period, base.on, base.sine) == (100000, 1, 1000, 100, 1000)
+    assert base.samples_per_period() == 1000
+    assert array_equal(base.pulse_on(0, 1000, 5.0), base.pulse_on(10 ** 15, 1000, 5.0))
+
+    # Unit 7e15 per Sec (freq 7, accuracy 15): sample number * step is above int64 after ~1300 Sec.
+    base = TimeBase(1e-4, 0.142857142857143, 0.014285714285714, 7)
+    assert base.step * 10 ** 8 > 2 ** 63
+    assert base.time(10 ** 8, 3).tolist() == [1e4, 1e4 + 1e-4, 1e4 + 2e-4]
+    assert base.time(10 ** 12, 2).tolist() == [1e8, 1e8 + 1e-4]
+    assert base.pulse_on(10 ** 12, 3000, 5.0).tolist() == reference(10 ** 12, 3000, exact(1e-4), exact(0.142857142857143), exact(0.014285714285714))
@@ -0,0 +1,28 @@
+import pytest
+
+from numpy import array, array_equal, isin, searchsorted
+from engine import PWMEngine, X_AXIS, PULSE_ON
+from waveform import pwm_edges, off_wave
+
+
+@pytest.mark.parametrize("scroll", [0, 1234, 2950])
+def test_pwm_edges(scroll):
+    """
+    Step curve from edges has same level as samples (except samples exactly on an edge), 4 points per cycle.
+    """
+    engine = PWMEngine(duty=25)
+    window = engine.window()[:, scroll:]
+    if scroll:
+        window = [[*row, *new] for row, new in zip(window, engine.next_block(scroll))]
+    x_axis, levels = array(window[X_AXIS]), array(window[PULSE_ON])
+    x_edges, y_edges = pwm_edges(x_axis[0], x_axis[-1], engine.time_period, engine.pulse_on_time, engine.voltage)
+    assert len(x_edges) <= 4 * (engine.number_of_cycles + 1) + 2
+    assert x_edges[0] == x_axis[0] and x_edges[-1] == x_axis[-1]
+
+    curve = y_edges[searchsorted(x_edges, x_axis, side="right") - 1]
+    away = ~isin(x_axis.round(9), x_edges.round(9))
+    assert array_equal(curve[away], levels[away])
+
+
+def test_off_wave():
+    assert array_equal(off_wave(array([5.0, 0.0, 5.0]), 5.0), [0.0, 5.0, 0.0])
@@ -0,0 +1,132 @@
+"""
+Exact time base: time of sample = sample number * step size, in integer units, no float accumulation or rounding.
+e.g. step 0.00001, time period 0.01 -> unit 1/100000 Sec, step 1, period 1000.
+Pulse edges land on the same samples in every cycle, after any number of samples.
+"""
+from fractions import Fraction
+from functools import lru_cache
+from math import lcm, pi
+from numpy import arange, asarray, int64, sin, take_along_axis, where
+
+
+def exact(value):
+    """
+    Decimal value of float, as typed or rounded: 0.1 -> 1/10 (not 3602879701896397/36028797018963968).
+    """
+    return Fraction(repr(float(value)))
+
+
+class TimeBase:
+    """
+    Sample n is at n * step. PWM cycle starts at every time period, ON from start of cycle for pulse width (both included).
+    Sine period is 1 / freq (not rounded time period).
+    """
+    def __init__(self, step_size, time_period, pulse_on_time, freq):
+        values = exact(step_size), exact(time_period), exact(pulse_on_time), Fraction(1, int(freq))
+        self.unit = lcm(*(value.denominator for value in values))     # Units per Sec.
+        self.step, self.period, self.on, self.sine = (int(value * self.unit) for value in values)
+        if self.step <= 0 or self.period <= 0:
+            raise ValueError("Step Size and Time Period must be above 0")
+
+    def samples_per_period(self, period=None):
+        """
+        Samples in time period (or other period in units), None when it is not a whole number.
+        """
+        period = self.period if period is None else period
+        return period // self.step if period % self.step == 0 else None
+
+    def window_size(self, number_of_cycles):
+        """
+        Samples in number_of_cycles, last sample is before end of last cycle.
+        """
+        return -(-number_of_cycles * self.period // self.step)
+
+    def phase(self, start_index, count, period):
+        """
+        Time of count samples from sample number start_index, modulo period (units). Sample numbers can be any size.
+        """
+        first = start_index * self.step % period
+        return (first + arange(count, dtype=int64) * self.step) % period
+
+    def time(self, start_index, count):
+        """
+        X axis (Sec), whole seconds plus the rest of exact time (both in Python ints first), sample numbers can be any size.
+        """
+        seconds, rest = divmod(start_index * self.step, self.unit)
+        return seconds + (rest + arange(count, dtype=int64) * self.step) / self.unit
+
+    def pulse_on(self, start_index, count, voltage):
+        """
+        PWM ON state levels.
+        """
+        return where(self.phase(start_index, count, self.period) <= self.on, voltage, 0.0)
+
+    def position(self, start_index, count, freq):
+        """
+        Position of samples in period of freq (Hz, whole number), 0 -> 1.
+        """
+        step = self.step * freq
+        return (start_index * step % self.unit + arange(count, dtype=int64) * step) % self.unit / self.unit
+
+    def cycle_positions(self, first_cycle, cycles, freq):
+        """
+        Position of start of PWM cycles first_cycle.. in period of freq (Hz, whole number), 0 -> 1.
+        """
+        step = self.period * freq
+        return (first_cycle * step % self.unit + arange(cycles, dtype=int64) * step) % self.unit / self.unit
+
+    def span(self, freq):
+        """
+        Periods of freq (Hz, whole number) per PWM cycle.
+        """
+        return self.period * freq / self.unit
+
+    def modulated_pulse_on(self, start_index, count, voltage, modulation):
+        """
+        PWM ON state, reference of modulation compared with its carrier at every sample.
+        """
+        first_cycle, offset = divmod(start_index * self.step, self.period)
+        ticks = offset + arange(count, dtype=int64) * self.step      # Time from start of first cycle.
+        cycle = ticks // self.period
+        cycles = int(cycle[-1]) + 1 if count else 0
+        in_cycle = (ticks - cycle * self.period) / self.period
+        position = self.cycle_positions(first_cycle, cycles, modulation.freq)[cycle] + in_cycle * self.span(modulation.freq)
+        return where(modulation.on(in_cycle, position), voltage, 0.0)
+
+    def shifted_pulse_on(self, start_index, count, shifts, divisions, modulation=None):
+        """
+        ON state (bool) of the PWM signal delayed by shift / divisions of time period, shape: (len(shifts), count).
+        Same edge rule (fixed pulse, or modulation compared with carrier) as pulse_on() and modulated_pulse_on(),
+        shift 0 is the same signal. Times are exact, in units / divisions.
+        """
+        period, step = self.period * divisions, self.step * divisions
+        shifts = [int(shift) for shift in shifts]
+        first_cycles, offsets = zip(*(divmod(start_index * step - shift * self.period, period) for shift in shifts)) if shifts else ((), ())
+        ticks = asarray(offsets, dtype=int64)[:, None] + arange(count, dtype=int64) * step    # Time from start of first cycle.
+        if modulation is None:
+            return ticks % period <= self.on * divisions
+        cycle = ticks // period
+        cycles = int(cycle[:, -1].max()) + 1 if count and shifts else 0
+        positions = asarray([self.cycle_positions(first, cycles, modulation.freq) for first in first_cycles]).reshape(len(shifts), cycles)
+        in_cycle = (ticks - cycle * period) / period
+        return modulation.on(in_cycle, take_along_axis(positions, cycle, axis=1) + in_cycle * self.span(modulation.freq))
+
+    def reference_wave(self, start_index, count, voltage, modulation):
+        """
+        Modulation reference as duty * voltage, compared with carrier of modulation.
+        """
+        return voltage * modulation.duty(self.position(start_index, count, modulation.freq))
+
+    def sine_wave(self, start_index, count, voltage):
+        """
+        Sine wave of signal frequency, angle from time in current sine period (no precision loss after long runs).
+        """
+        return voltage * sin(self.phase(start_index, count, self.sine) * (2 * pi / self.sine))
+
+
+@lru_cache(maxsize=16)
+def time_base(step_size, time_period, pulse_on_time, freq):
+    """
+    Cached TimeBase for signal values.
+    """
+    return TimeBase(step_size, time_period, pulse_on_time, freq)
@@ -0,0 +1,101 @@
+"""
+Waveform engine, generates PWM (ON), OFF and Sine traces for whole time arrays with NumPy.
+No GUI code here, same functions are used by the simulator window and can be used by scripts.
+"""
+from fractions import Fraction
+from functools import lru_cache
+from math import floor, lcm
+from numpy import append, arange, broadcast_to, concatenate, flatnonzero, repeat, resize, stack, tile, where
+from modulation import TRIANGLE
+from timebase import time_base
+
+MAX_TEMPLATE = 1 << 18                  # Samples, longest template (2 MB), cache holds at most 64 of them.
+
+
+def pwm_edges(start, end, time_period, pulse_on_time, voltage):
+    """
+    PWM ON state between start and end (time) as corner points, 4 per cycle: (rise, 0) (rise, V) (fall, V) (fall, 0),
+    plus first and last point at window borders. Draw as connected lines (step curve),
+    number of points depends on cycles only, not on step size. Returns (x, y).
+    pulse_on_time: same for all cycles, or one per cycle from floor(start / time_period) to floor(end / time_period).
+    """
+    first, last = floor(start / time_period), floor(end / time_period)
+    rise = arange(first, last + 1) * time_period
+    pulse = broadcast_to(pulse_on_time, rise.shape)
+    fall = rise + pulse
+    x_axis = concatenate(([start], stack((rise, rise, fall, fall), axis=1).ravel(), [end]))
+    y_axis = concatenate(([0.0], tile((0.0, voltage, voltage, 0.0), len(rise)), [0.0]))
+    before, after = x_axis < start, x_axis > end
+    before[0] = after[-1] = True            # First and last point are at borders.
+    for border, outside, border_pulse in ((start, before, pulse[0]), (end, after, pulse[-1])):
+        x_axis[outside] = border            # Points outside window are moved to border, with level at border.
+        y_axis[outside] = voltage if border - floor(border / time_period) * time_period <= border_pulse else 0.0
+    return x_axis, y_axis
+
+
+def level_edges(x_axis, levels):
+    """
+    Step curve of sampled levels as corner points: first sample, (x, level before) (x, level after) at every change, last sample.
+    Number of points depends on changes only, for signals without one pulse per cycle (modulation). Returns (x, y).
+    """
+    change = flatnonzero(levels[1:] != levels[:-1]) + 1
+    x_edges = concatenate(([x_axis[0]], repeat(x_axis[change], 2), [x_axis[-1]]))
+    y_edges = concatenate(([levels[0]], stack((levels[change - 1], levels[change]), axis=1).ravel(), [levels[-1]]))
+    return x_edges, y_edges
+
+
+def carrier_edges(start, end, time_period, voltage, carrier=TRIANGLE):
+    """
+    Carrier of modulated PWM (0 -> voltage) between start and end (time) as corner points, ON while carrier <= reference (duty * voltage):
+    triangle = (start of cycle, V) (middle of cycle, 0), sawtooth = (start of cycle, 0) (end of cycle, V) then down to 0.
+    Whole cycles, first and last points can be outside window. Returns (x, y).
+    """
+    first, last = floor(start / time_period), floor(end / time_period)
+    cycle = arange(first, last + 2) * time_period
+    if carrier == TRIANGLE:
+        x_axis = append(stack((cycle[:-1], cycle[:-1] + time_period / 2), axis=1).ravel(), cycle[-1])
+        return x_axis, append(tile((voltage, 0.0), len(cycle) - 1), voltage)
+    return stack((cycle[:-1], cycle[1:]), axis=1).ravel(), tile((0.0, voltage), len(cycle) - 1)
+
+
+def off_wave(levels, voltage):
+    """
+    PWM OFF state, inverse of ON state levels.
+    """
+    return where(levels == voltage, 0.0, voltage)
+
+
+@lru_cache(maxsize=64)
+def period_template(kind, freq, time_period, pulse_on_time, voltage, step_size, modulation=None):
+    """
+    One period of "on" (PWM ON state) or "sine" samples from exact time base, None when period is not a whole number of samples,
+    or longer than MAX_TEMPLATE samples (samples are computed from time base then).
+    With modulation, whole periods of reference and PWM ("sine" = reference trace).
+    Signal is periodic, any sample is template[sample number % len(template)].
+    Least recently used templates are dropped, period_template.cache_info() = hits, misses.
+    """
+    base = time_base(step_size, time_period, pulse_on_time, freq)
+    if modulation is None:
+        length = base.samples_per_period(base.period if kind == "on" else base.sine)
+    else:
+        # Signal repeats after whole reference periods, carrier periods and steps: lcm(unit / freq, period, step).
+        repeat = lcm(Fraction(base.unit, modulation.freq).numerator, base.period, base.step)
+        length = repeat // base.step
+    if length is None or length > MAX_TEMPLATE:
+        return None
+    if modulation is None:
+        template = base.pulse_on(0, length, voltage) if kind == "on" else base.sine_wave(0, length, voltage)
+    else:
+        template = base.modulated_pulse_on(0, length, voltage, modulation) if kind == "on" else base.reference_wave(0, length, voltage, modulation)
+    template.flags.writeable = False        # Shared by all users of the cache.
+    return template
+
+
+def from_template(template, start_index, count):
+    """
+    count samples of periodic signal from sample number start_index, repeated from one period template.
+    """
+    offset = start_index % len(template)
+    if offset + count <= len(template):
+        return template[offset:offset + count]      # Read only view.
+    return resize(concatenate((template[offset:], template[:offset])), count)